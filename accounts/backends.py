@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .models import Profile
+
+
+UserModel = get_user_model()
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend loading the profile together with the user of the session,
+    so that request.user.profile does not cost a query.
+    """
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+
+        if not hasattr(user, 'profile'):
+            # Users created outside of the activation flow (e.g. createsuperuser) have no profile,
+            # they get an empty unsaved one instead of RelatedObjectDoesNotExist
+            user.profile = Profile(user=user)
+        return user
@@ -0,0 +1,36 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from word_bank.config import LEVEL_XP, LEVEL_XP_INCREMENT, MAX_LEVEL
+
+
+# Experience needed for each level, sorted, indexed by level
+LEVEL_XP_THRESHOLDS = tuple(LEVEL_XP.values())
+LEVEL_XP_THRESHOLDS_ARRAY = np.array(LEVEL_XP_THRESHOLDS)
+
+
+def get_level(experience: int) -> int:
+    return bisect_right(LEVEL_XP_THRESHOLDS, experience) - 1
+
+
+def get_level_progress(experience: int, level=None) -> float:
+    """Share of the current level completed, 1 at MAX_LEVEL."""
+    level = get_level(experience) if level is None else level
+    if level < MAX_LEVEL:
+        return (experience - LEVEL_XP[level]) / LEVEL_XP_INCREMENT[level + 1]
+
+    return 1
+
+
+def get_xp_to_next_level(experience: int, level=None) -> int:
+    level = get_level(experience) if level is None else level
+    if level < MAX_LEVEL:
+        return LEVEL_XP[level + 1] - experience
+
+    return 0
+
+
+def levels_for(experiences) -> np.ndarray:
+    """Levels of many experience values at once, e.g. for leaderboards and admin lists."""
+    return np.searchsorted(LEVEL_XP_THRESHOLDS_ARRAY, np.asarray(experiences), side='right') - 1
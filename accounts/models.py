@@ -1,8 +1,12 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
-from word_bank.config import LEVEL_XP, LEVEL_XP_INCREMENT, MAX_LEVEL
+from geogem.db import update_returning
+
+from .levels import get_level, get_level_progress, get_xp_to_next_level
 
 
 class CustomUser(AbstractUser):
@@ -33,7 +37,7 @@ class CustomUserTokenType(models.Model):
 class CustomUserToken(models.Model):    
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
     token_type = models.ForeignKey(CustomUserTokenType, on_delete=models.CASCADE)
-    expire_date = models.DateTimeField(verbose_name="Token expire date")
+    expire_date = models.DateTimeField(verbose_name="Token expire date", db_index=True)
     token = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
@@ -44,10 +48,22 @@ class CustomUserToken(models.Model):
             self.expire_date = timezone.now() + timezone.timedelta(days=3)
         super().save(*args, **kwargs)
 
+
+class ProfileQuerySet(models.QuerySet):
+    def add_experience(self, user, increase_by=1):
+        """Atomically add experience in a single statement. Return the new experience or None if there is no profile."""
+        rows = update_returning(
+            self.filter(user=user), ['experience'],
+            experience=Greatest(F('experience') + increase_by, Value(0), output_field=models.PositiveIntegerField()),
+        )
+        return rows[0][0] if rows else None
+
     
 class Profile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True)
     experience = models.PositiveIntegerField(default=0)
+    
+    objects = ProfileQuerySet.as_manager()
 
     def __str__(self):
         return f'Profile {self.user.get_username()}'
@@ -62,22 +78,16 @@ class Profile(models.Model):
 
     @property
     def level(self):
-        for level, xp in LEVEL_XP.items():
-            if self.experience < xp:
-                return level - 1
-                
-        return MAX_LEVEL
+        # Memoized together with the experience it was computed for, so changing experience invalidates it
+        memo = self.__dict__.get('_level_memo')
+        if memo is None or memo[0] != self.experience:
+            memo = self.__dict__['_level_memo'] = (self.experience, get_level(self.experience))
+        return memo[1]
                 
     @property
     def level_progress(self):
-        if self.level < MAX_LEVEL:
-            return (self.experience - LEVEL_XP[self.level]) / LEVEL_XP_INCREMENT[self.level+1]
-        
-        return 1
+        return get_level_progress(self.experience, self.level)
 
     @property
     def xp_to_next_level(self):
-        if self.level < MAX_LEVEL:
-            return LEVEL_XP[self.level + 1] - self.experience
-
-        return 0
+        return get_xp_to_next_level(self.experience, self.level)
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, tag
+from django.urls import reverse
+
+from accounts.backends import ProfileModelBackend
+from accounts.models import Profile
+
+
+@tag("backend", "backend_profile_model")
+class ProfileModelBackendTestCase(TestCase):
+    fixtures = ['test_users.json', 'test_profiles.json']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.backend = ProfileModelBackend()
+        cls.test_user = cls.User.objects.first()
+
+    def test_get_user_loads_profile(self):
+        experience = Profile.objects.get(user=self.test_user).experience
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(self.test_user.id)
+            self.assertEqual(user.profile.experience, experience)
+
+    def test_get_user_missing_profile(self):
+        Profile.objects.filter(user=self.test_user).delete()
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(self.test_user.id)
+            self.assertEqual(user.profile.experience, 0)
+        self.assertFalse(Profile.objects.filter(user=self.test_user).exists())
+
+    def test_get_user_does_not_exist(self):
+        self.assertIsNone(self.backend.get_user(0))
+
+    def test_get_user_inactive(self):
+        self.User.objects.filter(pk=self.test_user.pk).update(is_active=False)
+        self.assertIsNone(self.backend.get_user(self.test_user.id))
+
+    def test_request_user_profile_is_free(self):
+        self.client.force_login(self.test_user)
+        # Session, user with profile and the learned words count
+        with self.assertNumQueries(3):
+            self.client.get(reverse('accounts:profile'))
+
+    def test_model_backend_sessions_stay_logged_in(self):
+        self.client.force_login(self.test_user, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(reverse('accounts:profile'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.test_user)
@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase, tag
+
+from accounts.levels import *
+from accounts.models import Profile
+
+
+@tag("levels")
+class LevelsTestCase(SimpleTestCase):
+    def get_level_linear(self, experience):
+        for level, xp in LEVEL_XP.items():
+            if experience < xp:
+                return level - 1
+        return MAX_LEVEL
+
+    def test_get_level_matches_thresholds(self):
+        for experience in range(LEVEL_XP[MAX_LEVEL] + 10):
+            self.assertEqual(get_level(experience), self.get_level_linear(experience))
+
+    def test_get_level_progress_and_xp_to_next_level(self):
+        self.assertEqual(get_level_progress(0), 0)
+        self.assertEqual(get_xp_to_next_level(0), 1)
+        self.assertEqual(get_level_progress(LEVEL_XP[MAX_LEVEL]), 1)
+        self.assertEqual(get_xp_to_next_level(LEVEL_XP[MAX_LEVEL]), 0)
+
+    def test_levels_for(self):
+        experiences = list(range(LEVEL_XP[MAX_LEVEL] + 10))
+        self.assertEqual(levels_for(experiences).tolist(), [get_level(experience) for experience in experiences])
+        self.assertEqual(levels_for([]).tolist(), [])
+
+    def test_profile_level_memo_invalidated_on_experience_change(self):
+        profile = Profile(experience=0)
+        self.assertEqual(profile.level, 0)
+
+        profile.experience = LEVEL_XP[4]
+        self.assertEqual(profile.level, 4)
+        self.assertEqual(profile.xp_to_next_level, LEVEL_XP[5] - LEVEL_XP[4])
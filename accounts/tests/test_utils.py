@@ -39,6 +39,17 @@ class CheckUsernameExistsTestCase(TestCase):
         self.assertEqual(response.status_code, 204)
 
 
+@tag("utils", "utils_get_csrf_token")
+class GetCsrfTokenTestCase(TestCase):
+    def test_get_csrf_token_sets_cookie(self):
+        response = self.client.get(reverse('accounts:csrf_token'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('csrftoken', response.cookies)
+        self.assertTrue(response.json()['csrf_token'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+
 @tag("utils", "utils_activate_user")
 class ActivateUserTestCase(TestCase):
     fixtures = ['token_types.json']
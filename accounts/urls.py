@@ -8,6 +8,7 @@ app_name = 'accounts'
 urlpatterns = [
     path('signup/', SignUpView.as_view(), name='signup'),
     path('check-username-exists/', check_username_exists, name='check_username_exists'),
+    path('csrf-token/', get_csrf_token, name='csrf_token'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', logout_view, name='logout'),
 
@@ -3,8 +3,11 @@ from django.contrib.auth import get_user_model
 from django.core import signing
 from django.http import (HttpResponse, HttpResponseNotAllowed,
                          HttpResponseRedirect, JsonResponse)
+from django.middleware.csrf import get_token
 from django.urls import reverse
 from django.utils.timezone import timedelta
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.generic import View
 
 from geogem.gui_messages import GUI_MESSAGES
@@ -23,6 +26,13 @@ def check_username_exists(request):
             return HttpResponse(status=204)
 
     return HttpResponseNotAllowed(['GET'])
+
+
+@never_cache
+@ensure_csrf_cookie
+def get_csrf_token(request):
+    # Used by pages cached for anonymous users, which are rendered without a token
+    return JsonResponse({'csrf_token': get_token(request)})
     
 
 class ActivateUserView(View):
@@ -6,10 +6,12 @@ from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.contrib.messages.views import SuccessMessageMixin
 from django.shortcuts import render
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext as _
 from django.views.generic import FormView, RedirectView, TemplateView, View
 
 from geogem.gui_messages import get_gui_messages
+from word_bank.decorators import cache_anonymous_page
 
 from .forms import *
 from .models import CustomUserTokenType
@@ -17,6 +19,7 @@ from .tokens import generate_user_token
 from .utils import *
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class IndexView(TemplateView):
     template_name = 'index.html'
     
@@ -206,6 +209,7 @@ class SetPasswordView(FormView):
         return super().form_valid(form)
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class PremiumView(View):
     template_name = 'word_bank/premium.html'
 
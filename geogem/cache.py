@@ -0,0 +1,34 @@
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import transaction
+
+
+def get_version(key, cache_alias=DEFAULT_CACHE_ALIAS) -> int:
+    """
+    Read a version counter that cache keys include, so that incrementing it makes their entries stale.
+    Starts from the clock so that a lost version never brings back older entries.
+    """
+    cache = caches[cache_alias]
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def increment_version(key, cache_alias=DEFAULT_CACHE_ALIAS):
+    cache = caches[cache_alias]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_version(key, cache_alias=DEFAULT_CACHE_ALIAS):
+    """
+    Increment the version now and again after the commit,
+    so that entries cached from the old rows during the transaction are dropped too.
+    """
+    increment_version(key, cache_alias)
+    transaction.on_commit(lambda: increment_version(key, cache_alias))
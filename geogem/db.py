@@ -0,0 +1,35 @@
+from django.db import connections, transaction
+from django.db.models import sql
+
+
+def supports_update_returning(connection) -> bool:
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+def update_returning(queryset, returning: list, **values) -> list:
+    """
+    Same as queryset.update(**values), but return the updated values of the returning fields.
+    Uses a single UPDATE ... RETURNING statement where the database supports it.
+    """
+    connection = connections[queryset.db]
+    if not supports_update_returning(connection):
+        with transaction.atomic(using=queryset.db):
+            pks = list(queryset.select_for_update().values_list('pk', flat=True))
+            queryset.model._base_manager.filter(pk__in=pks).update(**values)
+            return list(queryset.model._base_manager.filter(pk__in=pks).values_list(*returning))
+
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    update_sql, params = query.get_compiler(queryset.db).as_sql()
+    columns = ', '.join(
+        connection.ops.quote_name(queryset.model._meta.get_field(field_name).column)
+        for field_name in returning
+    )
+    with transaction.mark_for_rollback_on_error(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{update_sql} RETURNING {columns}', params)
+            return [tuple(row) for row in cursor.fetchall()]
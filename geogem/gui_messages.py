@@ -1,14 +1,25 @@
+from functools import lru_cache
+from types import MappingProxyType
+
+from django.utils import translation
 from django.utils.translation import gettext_lazy as _
 
 
-def get_gui_messages(keys_to_get: list) -> dict:
+def get_gui_messages(keys_to_get: list) -> MappingProxyType:
+    """Translated messages of the given sections in the active language, shared read-only."""
+    return get_gui_messages_bundle(translation.get_language(), tuple(keys_to_get))
+
+
+@lru_cache(maxsize=None)
+def get_gui_messages_bundle(language: str, keys_to_get: tuple) -> MappingProxyType:
     gui_messages = dict()
-    for key in keys_to_get:
-        try:
-            gui_messages.update(GUI_MESSAGES[key])
-        except KeyError:
-            pass
-    return gui_messages
+    with translation.override(language):
+        for key in keys_to_get:
+            try:
+                gui_messages.update({name: str(message) for name, message in GUI_MESSAGES[key].items()})
+            except KeyError:
+                pass
+    return MappingProxyType(gui_messages)
 
 
 GUI_MESSAGES = {
@@ -238,6 +249,12 @@ GUI_MESSAGES = {
         'btn_previous': _('Previous'),
         # Translators: this is an "End Quiz" button value
         'btn_end_quiz': _('End Quiz'),
+        # Translators: this is a label above the answer options of a quiz question
+        'definition': _('Definition:'),
+        # Translators: this is shown when a quiz has no questions
+        'quiz_empty': _('Nobody here but us chickens.'),
+        # Translators: this is a "Return to index page" button value of an empty quiz
+        'btn_return_to_index': _('Return to index page'),
     },
     'quiz_results': {
         # Translators: this is a title of the "Quiz Results" page
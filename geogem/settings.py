@@ -52,6 +52,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'word_bank.middleware.CatalogueVersionMiddleware',
+    'word_bank.middleware.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,6 +89,29 @@ DATABASES = {
     }
 }
 
+# Redis is shared by all workers, without CACHE_LOCATION (docker-compose-lite.yml) each process keeps its own cache
+if os.environ.get('CACHE_LOCATION'):
+    cache_backend = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['CACHE_LOCATION'],
+    }
+else:
+    cache_backend = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+
+CACHES = {
+    'default': {
+        **cache_backend,
+        'LOCATION': cache_backend.get('LOCATION', 'default'),
+    },
+    'catalogue': {
+        **cache_backend,
+        'LOCATION': cache_backend.get('LOCATION', 'catalogue'),
+        'KEY_PREFIX': 'catalogue',
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -129,6 +154,12 @@ LOGOUT_REDIRECT_URL = 'index'
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ProfileModelBackend',
+    # Sessions from before ProfileModelBackend store this one, they stay logged in
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 LOCALE_PATHS = [
     os.path.join(BASE_DIR, 'locale'),
 ]
@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db.models.query_utils import DeferredAttribute
+from django.test.runner import DiscoverRunner
+
+
+class DeferredFieldLoaded(AssertionError):
+    pass
+
+
+@contextmanager
+def forbid_deferred_loading():
+    """
+    Raise DeferredFieldLoaded instead of querying a field deferred by only() or defer(),
+    which would run one query per instance when it happens in a loop.
+    """
+    original_get = DeferredAttribute.__get__
+
+    def get(self, instance, cls=None):
+        if instance is not None and self.field.attname not in instance.__dict__ and self._check_parent_chain(instance) is None:
+            raise DeferredFieldLoaded(
+                f'{instance.__class__.__name__}.{self.field.attname} is deferred, add it to the projection'
+            )
+        return original_get(self, instance, cls)
+
+    with mock.patch.object(DeferredAttribute, '__get__', get):
+        yield
+
+
+class DeferredLoadGuardRunner(DiscoverRunner):
+    """Test runner failing the tests that lazily load deferred fields."""
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._deferred_loading_guard = forbid_deferred_loading()
+        self._deferred_loading_guard.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._deferred_loading_guard.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
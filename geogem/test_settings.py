@@ -57,6 +57,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'word_bank.middleware.CatalogueVersionMiddleware',
+    'word_bank.middleware.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -92,6 +94,17 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Cached catalogue entries would outlive the rolled back test transactions,
+    # tests of the catalogue cache override it with a locmem cache
+    'catalogue': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -134,6 +147,14 @@ LOGOUT_REDIRECT_URL = 'index'
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+TEST_RUNNER = 'geogem.test_runner.DeferredLoadGuardRunner'
+
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ProfileModelBackend',
+    # Sessions from before ProfileModelBackend store this one, they stay logged in
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 LOCALE_PATHS = [
     os.path.join(BASE_DIR, 'locale'),
 ]
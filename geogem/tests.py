@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, tag
+from django.utils import translation
+
+from geogem.cache import bump_version, get_version, increment_version
+from geogem.db import update_returning
+from geogem.gui_messages import GUI_MESSAGES, get_gui_messages
+from geogem.test_runner import DeferredFieldLoaded, forbid_deferred_loading
+from word_bank.models import Block
+
+
+@tag("geogem", "gui_messages")
+class GuiMessagesTestCase(SimpleTestCase):
+    def test_get_gui_messages_merges_sections(self):
+        gui_messages = get_gui_messages(['base', 'quiz', 'missing_section'])
+
+        self.assertEqual(set(gui_messages), set(GUI_MESSAGES['base']) | set(GUI_MESSAGES['quiz']))
+    
+    def test_get_gui_messages_is_shared_and_read_only(self):
+        gui_messages = get_gui_messages(['base'])
+
+        self.assertIs(get_gui_messages(['base']), gui_messages)
+        with self.assertRaises(TypeError):
+            gui_messages['index'] = 'changed'
+    
+    def test_get_gui_messages_are_translated_strings(self):
+        with translation.override('en'):
+            gui_messages = get_gui_messages(['base'])
+
+        self.assertIs(type(gui_messages['index']), str)
+        self.assertEqual(gui_messages['index'], 'Home')
+    
+    def test_get_gui_messages_per_language(self):
+        with translation.override('en'):
+            english_messages = get_gui_messages(['base'])
+        with translation.override('ru'):
+            russian_messages = get_gui_messages(['base'])
+        
+        self.assertIsNot(english_messages, russian_messages)
+        self.assertNotEqual(english_messages['index'], russian_messages['index'])
+
+
+@tag("geogem", "test_runner")
+class ForbidDeferredLoadingTestCase(TestCase):
+    fixtures = ['test_blocks.json']
+
+    def test_deferred_field_loading_raises(self):
+        block = Block.objects.only('id', 'name').first()
+        with forbid_deferred_loading():
+            self.assertEqual(block.name, Block.objects.values_list('name', flat=True).first())
+            with self.assertRaises(DeferredFieldLoaded):
+                block.theory
+
+
+@tag("geogem", "db", "update_returning")
+class UpdateReturningTestCase(TestCase):
+    fixtures = ['test_blocks.json']
+    
+    def test_update_returning(self):
+        blocks = Block.objects.filter(slug='test-block')
+        rows = update_returning(blocks, ['name', 'is_visible'], name='Renamed', is_visible=True)
+
+        self.assertEqual(rows, [('Renamed', True)])
+        self.assertTrue(blocks.get().is_visible)
+    
+    @mock.patch("geogem.db.supports_update_returning", return_value=False)
+    def test_update_returning_without_returning_support(self, mock_supports_update_returning):
+        blocks = Block.objects.filter(slug__startswith='test-block')
+        rows = update_returning(blocks, ['name'], name=F('slug'))
+
+        self.assertEqual(sorted(rows), [('test-block',), ('test-block-2',)])
+
+
+@tag("geogem", "cache", "version")
+class VersionTestCase(TestCase):
+    key = 'test_version'
+
+    def setUp(self):
+        cache.delete(self.key)
+
+    def test_get_version_is_stable(self):
+        self.assertEqual(get_version(self.key), get_version(self.key))
+
+    def test_get_version_starts_from_the_clock(self):
+        version = get_version(self.key)
+        cache.delete(self.key)
+
+        self.assertGreater(get_version(self.key), version)
+
+    def test_increment_version(self):
+        version = get_version(self.key)
+        increment_version(self.key)
+
+        self.assertEqual(get_version(self.key), version + 1)
+
+    def test_bump_version_again_after_commit(self):
+        version = get_version(self.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version(self.key)
+            self.assertEqual(get_version(self.key), version + 1)
+
+        self.assertEqual(get_version(self.key), version + 2)
@@ -0,0 +1,74 @@
+import gzip
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import reverse
+
+from geogem.gui_messages import get_gui_messages
+from quizzer.quiz_builder import QuizBuilder
+from word_bank.catalogue import get_block_words
+from word_bank.models import Block
+
+
+class Command(BaseCommand):
+    help = 'Compares the size and render time of a multiple choice quiz rendered as HTML and as the JSON payload of the quiz shell'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--block', help='Slug of the block, the first block with words by default')
+        parser.add_argument('--questions', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def get_block(self, slug):
+        blocks = Block.objects.filter(slug=slug) if slug else Block.objects.filter(wordinfo__isnull=False).order_by('id')
+        block = blocks.first()
+        if block is None:
+            raise CommandError('No block to build the quiz from')
+        return block
+
+    def measure(self, render, repeat) -> tuple:
+        """(median render time in milliseconds, size in bytes, gzipped size in bytes) of the rendered content."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            content = render()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), len(content), len(gzip.compress(content))
+
+    def handle(self, *args, **options):
+        block = self.get_block(options['block'])
+        builder = QuizBuilder(block, get_block_words(block))
+        n_questions = options['questions']
+        gui_messages = get_gui_messages(['base', 'quiz'])
+        request = RequestFactory().post(reverse('quiz_multiple_choice'))
+        request.user = AnonymousUser()
+
+        def render_html():
+            context = {
+                'gui_messages': gui_messages,
+                'learning_block': block,
+                'questions': builder.multiple_choice(n_questions),
+                'quiz_session_id': '0' * 32,
+            }
+            return render_to_string('quizzer/quiz_multiple_choice.html', context, request=request).encode()
+
+        def render_json():
+            return JsonResponse({
+                'quiz_type': 'multiple_choice',
+                'quiz_session': '0' * 32,
+                'learning_block': {'slug': block.slug, 'name': block.name},
+                'questions': [question.to_record() for question in builder.multiple_choice(n_questions)],
+            }).content
+
+        def render_shell():
+            context = {'gui_messages': gui_messages, 'quiz_type': 'multiple_choice'}
+            return render_to_string('quizzer/quiz_shell.html', context, request=request).encode()
+
+        self.stdout.write(f'{block.slug}: {len(builder.words)} words, {n_questions} questions')
+        for label, render in [('HTML quiz', render_html), ('JSON questions', render_json), ('Quiz shell (cached)', render_shell)]:
+            render_time, size, gzipped_size = self.measure(render, options['repeat'])
+            self.stdout.write(f'{label:<20} {render_time:8.2f} ms {size:>9} B {gzipped_size:>8} B gzipped')
@@ -0,0 +1,16 @@
+from django.db import models
+
+from accounts.models import CustomUser
+
+
+class QuizSubmission(models.Model):
+    """Answers of a quiz committed in a batch, keyed by the quiz ID generated by the client."""
+    quiz_id = models.UUIDField(unique=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    quiz_type = models.CharField(max_length=20)
+    results = models.JSONField(default=list)
+    experience_gained = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.user} - {self.quiz_type} {self.quiz_id}'
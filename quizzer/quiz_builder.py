@@ -0,0 +1,108 @@
+from django.utils.functional import cached_property
+
+from word_bank.models import BlockDistractors, UserWord, system_random
+
+from .utils import sample_question_indices
+
+
+class Question:
+    """Question of a quiz as rendered by the quiz templates."""
+    __slots__ = ('id', 'word_index', 'prompt', 'answer', 'options', 'audio_url', 'example', 'example_image_url')
+
+    def __init__(self, id, word_index, prompt, answer, options=None, audio_url='', example='', example_image_url=''):
+        self.id = id
+        self.word_index = word_index
+        self.prompt = prompt
+        self.answer = answer
+        self.options = options
+        self.audio_url = audio_url
+        self.example = example
+        self.example_image_url = example_image_url
+
+    def __repr__(self):
+        return f'<Question {self.id}: {self.prompt}>'
+
+    def to_record(self) -> list:
+        """Compact form sent to the quiz shell, answers are checked on the server and left out."""
+        return [self.id, self.prompt, self.options, self.audio_url]
+
+
+class QuizBuilder:
+    """
+    Questions of every quiz type drawn from one pool of block words loaded up front.
+    Questions refer to the pool by index, so repeated words are never copied.
+    """
+    n_wrong = 3
+    learn_questions = 5
+
+    def __init__(self, block, words: list):
+        self.block = block
+        self.words = words
+
+    @cached_property
+    def distractors(self) -> BlockDistractors:
+        return BlockDistractors(self.words)
+
+    def build(self, quiz_type: str, user, n_questions=None) -> list:
+        """Questions of quiz_type for the user, loading the user words the learn and review quizzes depend on."""
+        if quiz_type == 'multiple_choice':
+            return self.multiple_choice(n_questions)
+
+        if quiz_type == 'learn':
+            learned_word_ids = None
+            if user.is_authenticated:
+                learned_word_ids = set(
+                    UserWord.objects.filter(word__blocks=self.block, user=user).values_list('word_id', flat=True)
+                )
+            return self.learn(learned_word_ids)
+
+        if quiz_type == 'review':
+            user_word_ids = dict(
+                UserWord.objects.filter(word__blocks=self.block, user=user).values_list('word_id', 'id')
+            )
+            return self.review(user_word_ids, n_questions)
+
+        raise ValueError(f'Unknown quiz type: {quiz_type}')
+
+    def multiple_choice(self, n_questions=None) -> list:
+        """Questions on the words of the block, their ids are word ids."""
+        indices = sample_question_indices(len(self.words), n_questions)
+        return [self.make_question(self.words[index].id, index, with_options=True) for index in indices]
+
+    def learn(self, learned_word_ids=None) -> list:
+        """
+        Questions on the words not learned yet, their ids are word ids.
+        Anonymous users (learned_word_ids is None) get distinct words of the whole block.
+        """
+        if learned_word_ids is None:
+            candidates = range(len(self.words))
+            n_questions = min(self.learn_questions, len(candidates))
+        else:
+            candidates = [index for index, word in enumerate(self.words) if word.id not in learned_word_ids]
+            n_questions = self.learn_questions
+
+        indices = sample_question_indices(len(candidates), n_questions)
+        return [self.make_question(self.words[candidates[i]].id, candidates[i]) for i in indices]
+
+    def review(self, user_word_ids: dict, n_questions=None) -> list:
+        """Questions on the user words, user_word_ids maps word ids to user word ids, which are the question ids."""
+        candidates = [index for index, word in enumerate(self.words) if word.id in user_word_ids]
+        indices = sample_question_indices(len(candidates), n_questions)
+        return [
+            self.make_question(user_word_ids[self.words[candidates[i]].id], candidates[i], with_options=True)
+            for i in indices
+        ]
+
+    def make_question(self, question_id, index: int, with_options=False) -> Question:
+        word = self.words[index]
+        options = None
+        if with_options:
+            options = [word.translation, *self.distractors.sample(word.id, self.n_wrong)]
+            system_random.shuffle(options)
+
+        return Question(
+            question_id, index, word.name, word.translation, options,
+            audio_url=word.audio.url if word.audio else '',
+            example=word.example or '',
+            example_image_url=word.example_image.url if word.example_image else '',
+        )
@@ -0,0 +1,125 @@
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from word_bank.models import UserWord, WordInfo
+
+from .utils import populate_example_span
+
+
+QuizQuestion = namedtuple('QuizQuestion', [
+    'question_id', 'word_id', 'name', 'transliteration', 'translation', 'example', 'audio', 'example_span',
+])
+
+
+class QuizSession:
+    """
+    Questions of a quiz kept in the cache from building the quiz until its results,
+    so that answers can be checked without loading words again.
+    """
+    key_prefix = 'quiz_session'
+    timeout = 60 * 60 * 2
+
+    def __init__(self, quiz_type: str, block_slug: str, user_id=None, questions=None, session_id=None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.quiz_type = quiz_type
+        self.block_slug = block_slug
+        self.user_id = user_id
+        self.questions = questions or dict()
+
+    @classmethod
+    def from_questions(cls, quiz_type: str, block, user, questions, words: list):
+        """Build a session from the questions of a QuizBuilder and its pool of words."""
+        questions = {
+            question.id: cls.make_question(question.id, words[question.word_index]) for question in questions
+        }
+        return cls(quiz_type, block.slug, user.id if user.is_authenticated else None, questions)
+
+    @staticmethod
+    def make_question(question_id, word) -> QuizQuestion:
+        return QuizQuestion(
+            question_id, word.id, word.name, word.transliteration, word.translation,
+            word.example, word.audio.name or '', populate_example_span(word),
+        )
+
+    @classmethod
+    def get_cache_key(cls, session_id) -> str:
+        return f'{cls.key_prefix}:{session_id}'
+
+    @classmethod
+    def load(cls, session_id, user):
+        """Return the session if it exists and belongs to the user, None otherwise."""
+        if not session_id:
+            return None
+        data = cache.get(cls.get_cache_key(session_id))
+        if data is None:
+            return None
+
+        quiz_session = cls.deserialize(session_id, data)
+        if quiz_session.user_id != (user.id if user.is_authenticated else None):
+            return None
+        return quiz_session
+
+    def save(self):
+        cache.set(self.get_cache_key(self.session_id), self.serialize(), self.timeout)
+
+    def delete(self):
+        cache.delete(self.get_cache_key(self.session_id))
+
+    def serialize(self) -> tuple:
+        # Plain tuples keep the pickled cache value small
+        return (
+            self.quiz_type, self.block_slug, self.user_id,
+            tuple(tuple(question) for question in self.questions.values()),
+        )
+
+    @classmethod
+    def deserialize(cls, session_id, data: tuple):
+        quiz_type, block_slug, user_id, questions = data
+        questions = {question[0]: QuizQuestion(*question) for question in questions}
+        return cls(quiz_type, block_slug, user_id, questions, session_id=session_id)
+
+    def check_answer(self, question_id, answer: str):
+        """Return (is_correct, example_span) or None if the question is not part of the quiz."""
+        question = self.questions.get(question_id)
+        if question is None:
+            return None
+
+        is_correct = answer == question.translation
+        return is_correct, question.example_span if is_correct else ''
+
+    @cached_property
+    def questions_by_word_id(self) -> dict:
+        return {question.word_id: question for question in self.questions.values()}
+
+    def get_word(self, word_id):
+        """Unsaved WordInfo with the fields needed to display results, None if the word is not part of the quiz."""
+        question = self.questions_by_word_id.get(word_id)
+        if question is None:
+            return None
+
+        return WordInfo(
+            id=question.word_id, name=question.name, transliteration=question.transliteration,
+            translation=question.translation, example=question.example, audio=question.audio,
+        )
+
+    def get_user_words(self, user, ids: list, lookup='id') -> list:
+        """
+        User words matching ids on lookup ('id' or 'word_id'), in the given order with repeated questions.
+        Only points are loaded from the database, the words are built from the session.
+        Ids of other users' words or of words outside the quiz are skipped.
+        """
+        user_words = UserWord.objects.filter(user=user, **{f'{lookup}__in': set(ids)}).values_list(
+            'id', 'word_id', 'points', 'mastery_level'
+        )
+
+        user_words_by_id = dict()
+        for user_word_id, word_id, points, mastery_level in user_words:
+            word = self.get_word(word_id)
+            if word is not None:
+                user_word = UserWord(id=user_word_id, user=user, word=word, points=points, mastery_level=mastery_level)
+                user_words_by_id[user_word_id if lookup == 'id' else word_id] = user_word
+
+        return [user_words_by_id[item_id] for item_id in ids if item_id in user_words_by_id]
@@ -0,0 +1,107 @@
+from django.test import TestCase, tag
+
+from quizzer.quiz_builder import Question, QuizBuilder
+from quizzer.utils import sample_question_indices
+from word_bank.models import Block, WordInfo
+
+
+@tag("quizzer", "quiz_builder")
+class SampleQuestionIndicesTestCase(TestCase):
+    def test_sample_question_indices_empty_pool(self):
+        self.assertEqual(sample_question_indices(0), [])
+        self.assertEqual(sample_question_indices(0, n_questions=5), [])
+
+    def test_sample_question_indices_default_is_distinct(self):
+        indices = sample_question_indices(4)
+
+        self.assertEqual(sorted(indices), [0, 1, 2, 3])
+        self.assertEqual(len(sample_question_indices(30)), 10)
+        self.assertEqual(len(set(sample_question_indices(30))), 10)
+
+    def test_sample_question_indices_repeats_evenly(self):
+        indices = sample_question_indices(4, n_questions=8)
+
+        self.assertEqual(sorted(indices), [0, 0, 1, 1, 2, 2, 3, 3])
+
+        indices = sample_question_indices(4, n_questions=10)
+
+        self.assertEqual(len(indices), 10)
+        self.assertTrue(all(1 <= indices.count(index) <= 3 for index in range(4)))
+
+    def test_sample_question_indices_bounds(self):
+        self.assertEqual(len(sample_question_indices(4, n_questions=0)), 1)
+        self.assertEqual(len(sample_question_indices(4, n_questions=101)), 100)
+        self.assertEqual(len(set(sample_question_indices(4, n_questions=4))), 4)
+
+
+@tag("quizzer", "quiz_builder")
+class QuizBuilderTestCase(TestCase):
+    fixtures = ['test_blocks.json', 'test_word_infos.json']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_block = Block.objects.first()
+        cls.test_words = list(WordInfo.objects.filter(blocks=cls.test_block).for_quiz())
+        cls.test_words_by_id = {word.id: word for word in cls.test_words}
+
+    def setUp(self):
+        self.builder = QuizBuilder(self.test_block, self.test_words)
+
+    def test_question_has_no_instance_dict(self):
+        question = self.builder.make_question(1, 0)
+
+        self.assertIsInstance(question, Question)
+        self.assertFalse(hasattr(question, '__dict__'))
+
+    def test_multiple_choice(self):
+        with self.assertNumQueries(0):
+            questions = self.builder.multiple_choice()
+
+        self.assertEqual(len(questions), len(self.test_words))
+        for question in questions:
+            word = self.test_words_by_id[question.id]
+            self.assertIs(self.test_words[question.word_index], word)
+            self.assertEqual(question.prompt, word.name)
+            self.assertEqual(question.answer, word.translation)
+            self.assertIn(question.answer, question.options)
+            self.assertEqual(len(question.options), 4)
+
+    def test_multiple_choice_options_are_capped_by_block_size(self):
+        self.builder.n_wrong = 100
+        questions = self.builder.multiple_choice()
+
+        for question in questions:
+            self.assertEqual(sorted(question.options), sorted(word.translation for word in self.test_words))
+
+    def test_multiple_choice_with_repetition(self):
+        questions = self.builder.multiple_choice(n_questions=2 * len(self.test_words))
+        question_ids = [question.id for question in questions]
+
+        self.assertEqual(sorted(question_ids), sorted(2 * list(self.test_words_by_id)))
+
+    def test_learn_skips_learned_words(self):
+        learned_word_ids = {self.test_words[0].id, self.test_words[1].id}
+        questions = self.builder.learn(learned_word_ids)
+
+        self.assertEqual(len(questions), QuizBuilder.learn_questions)
+        self.assertTrue(learned_word_ids.isdisjoint(question.id for question in questions))
+        self.assertIsNone(questions[0].options)
+
+    def test_learn_all_words_learned(self):
+        self.assertEqual(self.builder.learn(set(self.test_words_by_id)), [])
+
+    def test_learn_as_anonymous_user_is_capped(self):
+        self.builder.learn_questions = 3
+        questions = self.builder.learn()
+
+        self.assertEqual(len(questions), 3)
+        self.assertEqual(len({question.id for question in questions}), 3)
+
+    def test_review_questions_are_user_words(self):
+        user_word_ids = {self.test_words[0].id: 10, self.test_words[1].id: 20}
+        questions = self.builder.review(user_word_ids)
+
+        self.assertEqual(sorted(question.id for question in questions), [10, 20])
+        for question in questions:
+            self.assertEqual(user_word_ids[self.test_words[question.word_index].id], question.id)
+            self.assertIn(question.answer, question.options)
@@ -0,0 +1,106 @@
+import pickle
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, tag
+
+from quizzer.quiz_builder import QuizBuilder
+from quizzer.quiz_session import QuizSession
+from word_bank.models import Block, UserWord, WordInfo
+
+
+@tag("quizzer", "quiz_session")
+class QuizSessionTestCase(TestCase):
+    fixtures = [
+        'test_users.json', 'test_blocks.json',
+        'test_word_infos.json', 'test_user_words.json'
+    ]
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.test_block = Block.objects.first()
+        cls.test_user = cls.User.objects.first()
+        cls.test_words = list(WordInfo.objects.filter(blocks=cls.test_block))
+        cls.test_word_info = cls.test_words[0]
+        cls.test_user_words = list(UserWord.objects.filter(user=cls.test_user).select_related('word'))
+    
+    def setUp(self):
+        cache.clear()
+        self.builder = QuizBuilder(self.test_block, self.test_words)
+        self.quiz_session = QuizSession.from_questions(
+            'multiple_choice', self.test_block, self.test_user, self.builder.multiple_choice(), self.test_words
+        )
+    
+    def test_quiz_session_save_and_load(self):
+        self.quiz_session.save()
+        with self.assertNumQueries(0):
+            quiz_session = QuizSession.load(self.quiz_session.session_id, self.test_user)
+
+        self.assertEqual(quiz_session.quiz_type, 'multiple_choice')
+        self.assertEqual(quiz_session.block_slug, self.test_block.slug)
+        self.assertEqual(quiz_session.questions, self.quiz_session.questions)
+    
+    def test_quiz_session_load_missing(self):
+        self.assertIsNone(QuizSession.load('missing', self.test_user))
+        self.assertIsNone(QuizSession.load(None, self.test_user))
+    
+    def test_quiz_session_load_other_user(self):
+        self.quiz_session.save()
+        
+        self.assertIsNone(QuizSession.load(self.quiz_session.session_id, AnonymousUser()))
+        self.assertIsNone(QuizSession.load(self.quiz_session.session_id, self.User.objects.get(pk=2)))
+    
+    def test_quiz_session_delete(self):
+        self.quiz_session.save()
+        self.quiz_session.delete()
+
+        self.assertIsNone(QuizSession.load(self.quiz_session.session_id, self.test_user))
+    
+    def test_quiz_session_serialized_form_is_plain_tuples(self):
+        data = self.quiz_session.serialize()
+        quiz_session = QuizSession.deserialize(self.quiz_session.session_id, pickle.loads(pickle.dumps(data)))
+
+        self.assertNotIn(b'QuizQuestion', pickle.dumps(data))
+        self.assertEqual(quiz_session.questions, self.quiz_session.questions)
+    
+    def test_quiz_session_check_answer(self):
+        correct = self.quiz_session.check_answer(self.test_word_info.id, self.test_word_info.translation)
+        incorrect = self.quiz_session.check_answer(self.test_word_info.id, 'wrong')
+
+        self.assertEqual(correct, (True, 'test_example'))
+        self.assertEqual(incorrect, (False, ''))
+        self.assertIsNone(self.quiz_session.check_answer(0, 'wrong'))
+    
+    def test_quiz_session_review_questions_are_user_words(self):
+        questions = self.builder.review({user_word.word_id: user_word.id for user_word in self.test_user_words})
+        quiz_session = QuizSession.from_questions('review', self.test_block, self.test_user, questions, self.test_words)
+        user_word = self.test_user_words[0]
+
+        self.assertEqual(set(quiz_session.questions), {user_word.id for user_word in self.test_user_words})
+        self.assertTrue(quiz_session.check_answer(user_word.id, user_word.word.translation)[0])
+    
+    def test_quiz_session_from_questions(self):
+        questions = self.builder.multiple_choice(n_questions=12)
+        quiz_session = QuizSession.from_questions('multiple_choice', self.test_block, self.test_user, questions, self.test_words)
+
+        self.assertEqual(set(quiz_session.questions), {question.id for question in questions})
+        self.assertTrue(quiz_session.check_answer(questions[0].id, questions[0].answer)[0])
+    
+    def test_quiz_session_get_user_words(self):
+        user_word_ids = [user_word.id for user_word in self.test_user_words]
+        quiz_words_ids = [user_word_ids[1], user_word_ids[0], user_word_ids[1], 0]
+
+        with self.assertNumQueries(1):
+            user_words = self.quiz_session.get_user_words(self.test_user, quiz_words_ids)
+
+        self.assertEqual([user_word.id for user_word in user_words], quiz_words_ids[:3])
+        self.assertEqual(user_words[0].points, self.test_user_words[1].points)
+        self.assertEqual(user_words[0].word.name, self.test_user_words[1].word.name)
+    
+    def test_quiz_session_get_user_words_by_word_id(self):
+        word_ids = [user_word.word_id for user_word in self.test_user_words]
+        user_words = self.quiz_session.get_user_words(self.test_user, word_ids, lookup='word_id')
+
+        self.assertEqual([user_word.word_id for user_word in user_words], word_ids)
@@ -30,4 +30,8 @@ class QuizzerUrlsTestCase(SimpleTestCase):
     def test_add_to_learned_url_resolves(self):
         url = reverse('add_to_learned')
         self.assertEqual(resolve(url).func, add_to_learned)
-    
\ No newline at end of file
+    
+    
+    def test_submit_answers_url_resolves(self):
+        url = reverse('submit_answers')
+        self.assertEqual(resolve(url).func, submit_answers)
@@ -3,67 +3,8 @@ from django.test import TestCase, tag
 from django.urls import reverse
 
 from quizzer.utils import *
-from word_bank.models import Block, UserWord, WordInfo
-
-
-@tag("quizzer", "utils", "utils_update_user_word_points")
-class UpdateUserWordPointsTestCase(TestCase):
-    fixtures = ['test_users.json', 'test_blocks.json', 'test_word_infos.json']
-    
-    @classmethod
-    def setUpTestData(cls):
-        cls.User = get_user_model()
-        cls.test_user = cls.User.objects.first()
-        cls.test_word_info = WordInfo.objects.first()
-        cls.test_user_word = UserWord.objects.create(user=cls.test_user, word=cls.test_word_info, points=50)
-
-    def test_update_user_word_points_correct_answer(self):
-        is_correct = update_user_word_points('test', 'test', self.test_user_word)
-
-        self.assertTrue(is_correct)
-        self.assertEqual(self.test_user_word.points, 51)
-
-    def test_update_user_word_points_incorrect_answer(self):
-        is_correct = update_user_word_points('wrong', 'test', self.test_user_word)
-
-        self.assertFalse(is_correct)
-        self.assertEqual(self.test_user_word.points, 49)
-
-    def test_update_user_word_points_increase_by_10(self):
-        is_correct = update_user_word_points('test', 'test', self.test_user_word, increase_by=10)
-
-        self.assertTrue(is_correct)
-        self.assertEqual(self.test_user_word.points, 60)
-
-    def test_update_user_word_points_decrease_by_10(self):
-        is_correct = update_user_word_points('wrong', 'test', self.test_user_word, decrease_by=10)
-
-        self.assertFalse(is_correct)
-        self.assertEqual(self.test_user_word.points, 40)
-
-    def test_update_user_word_points_no_change(self):
-        is_correct = update_user_word_points('test', 'test', self.test_user_word, increase_by=0, decrease_by=0)
-
-        self.assertTrue(is_correct)
-        self.assertEqual(self.test_user_word.points, 50)
-        
-    def test_update_user_word_points_no_change_incorrect_answer(self):
-        is_correct = update_user_word_points('wrong', 'test', self.test_user_word, increase_by=0, decrease_by=0)
-
-        self.assertFalse(is_correct)
-        self.assertEqual(self.test_user_word.points, 50)
-    
-    def test_update_user_word_points_overflow_100(self):
-        is_correct = update_user_word_points('test', 'test', self.test_user_word, increase_by=101)
-
-        self.assertTrue(is_correct)
-        self.assertEqual(self.test_user_word.points, 100)
-
-    def test_update_user_word_points_overflow_0(self):
-        is_correct = update_user_word_points('wrong', 'test', self.test_user_word, decrease_by=101)
-        
-        self.assertFalse(is_correct)
-        self.assertEqual(self.test_user_word.points, 0)
+from quizzer.models import QuizSubmission
+from word_bank.models import Block, BlockProgress, UserWord, WordInfo
 
 
 @tag("quizzer", "utils", "utils_update_profile_experience")
@@ -90,6 +31,18 @@ class UpdateProfileExperienceTestCase(TestCase):
 
         self.assertEqual(self.test_user_profile.experience, 60)
 
+    def test_update_profile_experience_returns_new_experience(self):
+        user = self.User.objects.get(pk=self.test_user.pk)
+        user_profile = user.profile
+        experience = update_profile_experience(user, increase_by=3)
+
+        self.assertEqual(experience, 53)
+        self.assertEqual(user_profile.experience, 53)
+    
+    def test_update_profile_experience_user_without_profile(self):
+        user = self.User.objects.create_user(username='test_user_without_profile')
+        self.assertIsNone(update_profile_experience(user))
+
 
 @tag("quizzer", "utils", "utils_add_to_learned")
 class AddToLearnedTestCase(TestCase):
@@ -238,8 +191,8 @@ class CheckAnswerTestCase(TestCase):
         self.test_user_word.refresh_from_db(fields=['points'])
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(self.test_user_profile.experience - profile_exp_before, 2)
-        self.assertEqual(self.test_user_word.points - user_word_points_before, 2)
+        self.assertEqual(self.test_user_profile.experience, profile_exp_before)
+        self.assertEqual(self.test_user_word.points, user_word_points_before)
         self.assertJSONEqual(response_content, {
             'is_correct': True,
             'example_span': 'test_example'
@@ -262,12 +215,11 @@ class CheckAnswerTestCase(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(self.test_user_profile.experience, profile_exp_before)
-        self.assertEqual(self.test_user_word.points - user_word_points_before, -1)
+        self.assertEqual(self.test_user_word.points, user_word_points_before)
         self.assertJSONEqual(response_content, {
             'is_correct': False,
             'example_span': ''
         })
-
     
     def test_check_answer_review_correct_answer_as_authenticated_user_POST(self):
         self.client.force_login(self.test_user)
@@ -285,8 +237,8 @@ class CheckAnswerTestCase(TestCase):
         self.test_user_word.refresh_from_db(fields=['points'])
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(self.test_user_profile.experience - profile_exp_before, 1)
-        self.assertEqual(self.test_user_word.points - user_word_points_before, 1)
+        self.assertEqual(self.test_user_profile.experience, profile_exp_before)
+        self.assertEqual(self.test_user_word.points, user_word_points_before)
         
         self.assertJSONEqual(response_content, {
             'is_correct': True,
@@ -310,7 +262,7 @@ class CheckAnswerTestCase(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(self.test_user_profile.experience, profile_exp_before)
-        self.assertEqual(self.test_user_word.points - user_word_points_before, -1)
+        self.assertEqual(self.test_user_word.points, user_word_points_before)
         
         self.assertJSONEqual(response_content, {
             'is_correct': False,
@@ -318,6 +270,149 @@ class CheckAnswerTestCase(TestCase):
         })
 
 
+@tag("quizzer", "utils", "utils_submit_answers")
+class SubmitAnswersTestCase(TestCase):
+    fixtures = [
+        'test_users.json', 'test_profiles.json', 
+        'test_blocks.json', 'test_word_infos.json',
+        'test_user_words.json'
+    ]
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.url = reverse('submit_answers')
+        cls.test_block = Block.objects.first()
+        cls.test_word_info = WordInfo.objects.get(pk=1)
+        cls.test_word_info2 = WordInfo.objects.get(pk=2)
+
+        cls.test_user = cls.User.objects.first()
+        cls.test_user_word = UserWord.objects.get(user=cls.test_user, word=cls.test_word_info)
+        cls.test_user_no_words = cls.User.objects.get(username='test_user_no_words')
+    
+    def get_request_data(self, quiz_type, answers, quiz_id='c0ffee00-0000-4000-8000-000000000000'):
+        return {
+            'quiz_id': quiz_id,
+            'quiz_type': quiz_type,
+            'answers': json.dumps([
+                {'question_id': question_id, 'answer': answer} for question_id, answer in answers
+            ]),
+        }
+    
+    def test_submit_answers_method_not_allowed_GET(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+    
+    def test_submit_answers_as_anonymous_user_POST(self):
+        response = self.client.post(self.url, self.get_request_data('review', []))
+        self.assertEqual(response.status_code, 401)
+    
+    def test_submit_answers_invalid_data_POST(self):
+        self.client.force_login(self.test_user)
+        invalid_data = [
+            self.get_request_data('review', [], quiz_id='not-a-uuid'),
+            self.get_request_data('wrong_type', []),
+            {**self.get_request_data('review', []), 'answers': 'not json'},
+            {**self.get_request_data('review', []), 'answers': '[{"answer": "test_translation"}]'},
+        ]
+        for data in invalid_data:
+            response = self.client.post(self.url, data)
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(QuizSubmission.objects.exists())
+    
+    def test_submit_answers_review_POST(self):
+        self.client.force_login(self.test_user)
+        profile_exp_before = self.test_user.profile.experience
+        answers = [
+            (self.test_user_word.id, 'wrong'),
+            (self.test_user_word.id, 'test_translation'),
+            (self.test_user_word.id, 'test_translation'),
+        ]
+
+        response = self.client.post(self.url, self.get_request_data('review', answers))
+        response_content = response.content.decode('utf-8')
+        self.test_user_word.refresh_from_db(fields=['points'])
+        self.test_user.profile.refresh_from_db(fields=['experience'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response_content, {
+            'quiz_id': 'c0ffee00-0000-4000-8000-000000000000',
+            'created': True,
+            'results': [False, True, True],
+            'experience_gained': 2,
+        })
+        # 1 plus the summed change of -1 + 1 + 1
+        self.assertEqual(self.test_user_word.points, 2)
+        self.assertEqual(self.test_user.profile.experience - profile_exp_before, 2)
+        progress = BlockProgress.objects.get(user=self.test_user, block=self.test_block)
+        self.assertEqual(progress.points_sum, 2)
+    
+    def test_submit_answers_review_other_user_words_are_skipped_POST(self):
+        self.client.force_login(self.test_user_no_words)
+        answers = [(self.test_user_word.id, 'test_translation')]
+
+        response = self.client.post(self.url, self.get_request_data('review', answers))
+        self.test_user_word.refresh_from_db(fields=['points'])
+
+        self.assertEqual(response.json()['results'], [None])
+        self.assertEqual(self.test_user_word.points, 1)
+    
+    def test_submit_answers_multiple_choice_creates_user_words_POST(self):
+        self.client.force_login(self.test_user_no_words)
+        answers = [
+            (self.test_word_info.id, 'test_translation'),
+            (self.test_word_info2.id, 'wrong'),
+        ]
+
+        response = self.client.post(self.url, self.get_request_data('multiple_choice', answers))
+        user_words = dict(UserWord.objects.filter(user=self.test_user_no_words).values_list('word_id', 'points'))
+        progress = BlockProgress.objects.get(user=self.test_user_no_words, block=self.test_block)
+
+        self.assertEqual(response.json()['results'], [True, False])
+        self.assertEqual(user_words, {self.test_word_info.id: 2, self.test_word_info2.id: 0})
+        self.assertEqual(progress.learned_count, 2)
+        self.assertEqual(progress.points_sum, 2)
+    
+    def test_submit_answers_is_idempotent_POST(self):
+        self.client.force_login(self.test_user)
+        data = self.get_request_data('review', [(self.test_user_word.id, 'test_translation')])
+
+        first_response = self.client.post(self.url, data)
+        second_response = self.client.post(self.url, data)
+        self.test_user_word.refresh_from_db(fields=['points'])
+
+        self.assertTrue(first_response.json()['created'])
+        self.assertFalse(second_response.json()['created'])
+        self.assertEqual(first_response.json()['results'], second_response.json()['results'])
+        self.assertEqual(self.test_user_word.points, 2)
+        self.assertEqual(QuizSubmission.objects.count(), 1)
+    
+    def test_submit_answers_quiz_id_of_other_user_POST(self):
+        data = self.get_request_data('review', [(self.test_user_word.id, 'test_translation')])
+        self.client.force_login(self.test_user)
+        self.client.post(self.url, data)
+
+        self.client.force_login(self.test_user_no_words)
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, 409)
+    
+    def test_submit_answers_num_queries_do_not_depend_on_num_answers(self):
+        self.client.force_login(self.test_user)
+        # Both batches learn new words and change known ones
+        answers = [(self.test_word_info.id, 'test_translation'), (self.test_word_info2.id, 'wrong'), (3, 'wrong')]
+        with self.assertNumQueries(24):
+            self.client.post(self.url, self.get_request_data('multiple_choice', answers))
+        
+        new_words = WordInfo.objects.bulk_create([
+            WordInfo(name=f'word {i}', transliteration=f'word {i}', translation=f'translation {i}') for i in range(10)
+        ])
+        self.test_block.wordinfo_set.add(*new_words)
+        answers = [(self.test_word_info.id, 'test_translation')] + [(word.id, word.translation) for word in new_words]
+        with self.assertNumQueries(24):
+            self.client.post(self.url, self.get_request_data('multiple_choice', answers, quiz_id=str(uuid.uuid4())))
+
+
 @tag("quizzer", "utils", "utils_populate_example_span")
 class PopulateExampleSpanTestCase(TestCase):
     @classmethod
@@ -352,61 +447,3 @@ class PopulateExampleSpanTestCase(TestCase):
         self.assertIn("<img", result)
         self.assertIn(self.test_example_image_url, result)
         self.assertIn(self.test_example_text, result)
-
-
-@tag("quizzer", "utils", "utils_shuffle_questions_order")
-class ShuffleQuestionsOrderTestCase(TestCase):
-    @classmethod
-    def setUpTestData(cls):
-        cls.questions = [x for x in range(1, 5)]
-
-    def test_shuffle_questions_order_wrong_type(self):
-        result = shuffle_questions_order(1)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(result, [])
-    
-    def test_shuffle_questions_order_empty_list(self):
-        questions = []
-        result = shuffle_questions_order(questions)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(result, questions)
-    
-    def test_shuffle_questions_order_none_list(self):
-        questions = None
-        result = shuffle_questions_order(questions)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(result, [])
-        
-    def test_shuffle_questions_order_list_less_than_10(self):
-        result = shuffle_questions_order(self.questions)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(len(result), len(self.questions))
-
-    def test_shuffle_questions_order_sample_is_shorter_than_population(self):
-        result = shuffle_questions_order(self.questions, n_questions=3)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(len(result), 3)
-    
-    def test_shuffle_questions_order_sample_is_less_than_one(self):
-        result = shuffle_questions_order(self.questions, n_questions=0)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(len(result), 1)
-
-    def test_shuffle_questions_order_sample_is_longer_than_population(self):
-        result = shuffle_questions_order(self.questions, n_questions=10)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(len(result), 10)
-    
-    def test_shuffle_question_order_sample_is_longer_than_100(self):
-        result = shuffle_questions_order(self.questions, n_questions=101)
-
-        self.assertIsInstance(result, list)
-        self.assertEqual(len(result), 100)
-        
\ No newline at end of file
@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase, tag
 from django.urls import reverse
 
+from quizzer.quiz_builder import QuizBuilder
+from quizzer.quiz_session import QuizSession
+from quizzer.views import QUIZ_SHELL_MAX_AGE
 from word_bank.models import Block, UserWord, WordInfo
 
 
@@ -32,34 +36,64 @@ class QuizMultipleChoiceViewTestCase(TestCase):
     
     def test_quiz_multiple_choice_view_as_anonymous_user_POST(self):
         response = self.client.post(self.url, data=self.request_data)
-        words = response.context['words']
-        num_words = len(words)
+        questions = response.context['questions']
+        num_words = len(questions)
         
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
-        self.assertIsNotNone(words)
-        self.assertIsInstance(words, list)
+        self.assertIsNotNone(questions)
+        self.assertIsInstance(questions, list)
         self.assertEqual(num_words, self.test_block_num_words)
         
     def test_quiz_multiple_choice_view_as_authenticated_user_POST(self):
         self.client.force_login(self.test_user)
         response = self.client.post(self.url, data=self.request_data)
-        words = response.context['words']
-        num_words = len(words)
+        questions = response.context['questions']
+        num_words = len(questions)
      
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
-        self.assertIsNotNone(words)
-        self.assertIsInstance(words, list)
+        self.assertIsNotNone(questions)
+        self.assertIsInstance(questions, list)
         self.assertEqual(num_words, self.test_block_num_words)
     
+    def test_quiz_multiple_choice_view_saves_quiz_session(self):
+        self.client.force_login(self.test_user)
+        response = self.client.post(self.url, data=self.request_data)
+        quiz_session = QuizSession.load(response.context['quiz_session_id'], self.test_user)
+
+        self.assertIsNotNone(quiz_session)
+        self.assertEqual(quiz_session.quiz_type, 'multiple_choice')
+        self.assertEqual(set(quiz_session.questions), {question.id for question in response.context['questions']})
+    
+    def test_quiz_multiple_choice_view_check_answer_from_quiz_session(self):
+        self.client.force_login(self.test_user)
+        response = self.client.post(self.url, data=self.request_data)
+        question = response.context['questions'][0]
+        
+        # Session and user lookups only, the word comes from the quiz session
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('check_answer'), {
+                'quiz_type': 'multiple_choice',
+                'quiz_session': response.context['quiz_session_id'],
+                'question_id': question.id,
+                'answer': question.answer,
+            })
+
+        self.assertTrue(response.json()['is_correct'])
+    
     def test_quiz_multiple_choice_view_when_block_has_no_words(self):
         response = self.client.post(self.url, data={'learning_block': 'test-block-2'})
         
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'quizzer/quiz_empty.html')
         self.assertTemplateNotUsed(response, self.template_name)
-        self.assertNotIn('words', response.context)
+        self.assertNotIn('questions', response.context)
+
+    def test_quiz_multiple_choice_view_unknown_block(self):
+        response = self.client.post(self.url, data={'learning_block': 'missing'})
+
+        self.assertEqual(response.status_code, 404)
 
 
 @tag("quizzer", "view", "view_quiz_learn")
@@ -92,7 +126,7 @@ class QuizLearnViewTestCase(TestCase):
     def test_quiz_learn_view_all_words_learned_as_authenticated_user_POST(self):
         self.client.force_login(self.test_user_all_words_learned)
         response = self.client.post(self.url, data=self.request_data)
-        num_words = len(response.context['words'])
+        num_words = len(response.context['questions'])
         
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
@@ -102,7 +136,7 @@ class QuizLearnViewTestCase(TestCase):
     def test_quiz_learn_view_has_words_to_learn_as_authenticated_user_POST(self):
         self.client.force_login(self.test_user_no_words)
         response = self.client.post(self.url, data=self.request_data)
-        num_words = len(response.context['words'])
+        num_words = len(response.context['questions'])
         
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
@@ -111,12 +145,23 @@ class QuizLearnViewTestCase(TestCase):
         
     def test_quiz_learn_view_as_anonymous_user_POST(self):
         response = self.client.post(self.url, data=self.request_data)
-        num_words = len(response.context['words'])
+        num_words = len(response.context['questions'])
         
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
         self.assertEqual(response.context['learning_block'].slug, 'test-block')
         self.assertEqual(num_words, self.test_block_num_words)
+
+    def test_quiz_learn_view_as_anonymous_user_is_capped(self):
+        new_words = WordInfo.objects.bulk_create([
+            WordInfo(name=f'word {i}', transliteration=f'word {i}', translation=f'translation {i}') for i in range(20)
+        ])
+        self.test_block.wordinfo_set.add(*new_words)
+        response = self.client.post(self.url, data=self.request_data)
+        question_ids = [question.id for question in response.context['questions']]
+
+        self.assertEqual(len(question_ids), 5)
+        self.assertEqual(len(set(question_ids)), 5)
         
 
 @tag("quizzer", "view", "view_quiz_review")
@@ -160,8 +205,26 @@ class QuizReviewViewTestCase(TestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
-        self.assertIn('words', response.context)
-        self.assertEqual(len(response.context['words']), 2)
+        self.assertIn('questions', response.context)
+        self.assertEqual(len(response.context['questions']), 2)
+        for question in response.context['questions']:
+            self.assertIn(question.answer, question.options)
+    
+    def test_quiz_review_view_num_queries_do_not_depend_on_num_user_words(self):
+        self.client.force_login(self.test_user)
+        with self.assertNumQueries(5):
+            self.client.post(self.url, data=self.request_data)
+        
+        test_block = Block.objects.get(slug='test-block')
+        new_words = WordInfo.objects.bulk_create([
+            WordInfo(name=f'word {i}', transliteration=f'word {i}', translation=f'translation {i}') for i in range(20)
+        ])
+        test_block.wordinfo_set.add(*new_words)
+        UserWord.objects.bulk_create([UserWord(user=self.test_user, word=word) for word in new_words])
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, data=self.request_data)
+
+        self.assertEqual(len(response.context['questions']), 10)
     
     def test_quiz_review_view_as_authenticated_user_no_review_words(self):
         self.client.force_login(self.test_user)
@@ -170,7 +233,100 @@ class QuizReviewViewTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'quizzer/quiz_empty.html')
         self.assertTemplateNotUsed(response, self.template_name)
-        self.assertNotIn('words', response.context)
+        self.assertNotIn('questions', response.context)
+
+
+@tag("quizzer", "view", "view_quiz_shell")
+class QuizShellViewTestCase(TestCase):
+    fixtures = ['test_users.json']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.template_name = 'quizzer/quiz_shell.html'
+        cls.test_user = get_user_model().objects.first()
+
+    def test_quiz_shell_view_is_cacheable(self):
+        self.client.force_login(self.test_user)
+        response = self.client.get(reverse('quiz_shell', args=['multiple_choice']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, self.template_name)
+        self.assertTemplateUsed(response, 'base_layout.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn(f'max-age={QUIZ_SHELL_MAX_AGE}', response['Cache-Control'])
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertNotContains(response, self.test_user.username)
+        self.assertContains(response, response.context['gui_messages']['quiz_empty'])
+
+    def test_quiz_shell_view_unknown_quiz_type(self):
+        response = self.client.get(reverse('quiz_shell', args=['learn']))
+
+        self.assertEqual(response.status_code, 404)
+
+
+@tag("quizzer", "view", "view_quiz_questions")
+class QuizQuestionsViewTestCase(TestCase):
+    fixtures = [
+        'test_users.json', 'test_blocks.json',
+        'test_word_infos.json', 'test_user_words.json'
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse('quiz_questions')
+        cls.test_user = get_user_model().objects.first()
+        cls.test_block = Block.objects.first()
+        cls.test_words = {word.id: word for word in WordInfo.objects.filter(blocks=cls.test_block)}
+
+    def test_quiz_questions_view_multiple_choice(self):
+        response = self.client.post(self.url, {'quiz_type': 'multiple_choice', 'learning_block': 'test-block'})
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['learning_block'], {'slug': 'test-block', 'name': self.test_block.name})
+        self.assertEqual(len(data['questions']), len(self.test_words))
+        for question_id, prompt, options, audio_url in data['questions']:
+            word = self.test_words[question_id]
+            self.assertEqual(prompt, word.name)
+            self.assertIn(word.translation, options)
+
+        quiz_session = QuizSession.load(data['quiz_session'], AnonymousUser())
+        self.assertEqual(set(quiz_session.questions), set(self.test_words))
+
+    def test_quiz_questions_view_n_questions(self):
+        response = self.client.post(self.url, {
+            'quiz_type': 'multiple_choice', 'learning_block': 'test-block', 'n_questions': 100,
+        })
+
+        self.assertEqual(len(response.json()['questions']), 100)
+
+    def test_quiz_questions_view_review(self):
+        self.client.force_login(self.test_user)
+        response = self.client.post(self.url, {'quiz_type': 'review', 'learning_block': 'test-block'})
+        user_word_ids = set(UserWord.objects.filter(user=self.test_user).values_list('id', flat=True))
+
+        self.assertEqual({question[0] for question in response.json()['questions']}, user_word_ids)
+
+    def test_quiz_questions_view_review_as_anonymous_user(self):
+        response = self.client.post(self.url, {'quiz_type': 'review', 'learning_block': 'test-block'})
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_quiz_questions_view_empty_quiz(self):
+        response = self.client.post(self.url, {'quiz_type': 'multiple_choice', 'learning_block': 'test-block-2'})
+
+        self.assertEqual(response.json()['questions'], [])
+        self.assertIsNone(response.json()['quiz_session'])
+
+    def test_quiz_questions_view_bad_requests(self):
+        for data, status_code in [
+            ({'quiz_type': 'learn', 'learning_block': 'test-block'}, 400),
+            ({'quiz_type': 'multiple_choice', 'learning_block': 'test-block', 'n_questions': 'all'}, 400),
+            ({'quiz_type': 'multiple_choice', 'learning_block': 'missing'}, 404),
+        ]:
+            with self.subTest(data=data):
+                self.assertEqual(self.client.post(self.url, data).status_code, status_code)
 
 
 @tag("quizzer", "view", "view_quiz_results")
@@ -201,6 +357,11 @@ class QuizResultsViewTestCase(TestCase):
 
         self.assertEqual(response.status_code, 405)
         self.assertTemplateNotUsed(response, self.template_name)
+
+    def test_quiz_results_view_unknown_block(self):
+        response = self.client.post(self.url, data={**self.request_data, 'learning_block': 'missing'})
+
+        self.assertEqual(response.status_code, 404)
         
     def test_quiz_results_view_as_anonymous_user_POST(self):
         request_data = self.request_data
@@ -225,6 +386,65 @@ class QuizResultsViewTestCase(TestCase):
         self.assertIn('quiz_words', response.context)
         self.assertEqual(len(response.context['quiz_words']), 1)
     
+    def test_quiz_results_view_preserves_order_and_duplicates(self):
+        self.client.force_login(self.test_user)
+        user_word_ids = list(UserWord.objects.filter(user=self.test_user).values_list('id', flat=True))
+        quiz_words_ids = [user_word_ids[1], user_word_ids[0], user_word_ids[1]]
+        request_data = dict(self.request_data, quiz_words=','.join(map(str, quiz_words_ids)))
+
+        with self.assertNumQueries(4):
+            response = self.client.post(self.url, data=request_data)
+        
+        self.assertEqual([word.id for word in response.context['quiz_words']], quiz_words_ids)
+    
+    def test_quiz_results_view_skips_words_of_other_users(self):
+        self.client.force_login(self.test_user)
+        other_user_word = UserWord.objects.exclude(user=self.test_user).first()
+        request_data = dict(self.request_data, quiz_words=f'{self.test_user_word.id},{other_user_word.id}')
+
+        response = self.client.post(self.url, data=request_data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['quiz_words'], [self.test_user_word])
+
+    def test_quiz_results_view_words_from_quiz_session(self):
+        self.client.force_login(self.test_user)
+        user_words = list(UserWord.objects.filter(user=self.test_user).select_related('word'))
+        test_block = Block.objects.first()
+        builder = QuizBuilder(test_block, list(WordInfo.objects.filter(blocks=test_block)))
+        questions = builder.review({user_word.word_id: user_word.id for user_word in user_words})
+        quiz_session = QuizSession.from_questions('review', test_block, self.test_user, questions, builder.words)
+        quiz_session.save()
+        quiz_words_ids = [user_words[1].id, user_words[0].id]
+        request_data = dict(
+            self.request_data, quiz_type='review', quiz_session=quiz_session.session_id,
+            quiz_words=','.join(map(str, quiz_words_ids)),
+        )
+
+        response = self.client.post(self.url, data=request_data)
+        quiz_words = response.context['quiz_words']
+
+        self.assertEqual([word.id for word in quiz_words], quiz_words_ids)
+        self.assertEqual([word.word.name for word in quiz_words], [user_words[1].word.name, user_words[0].word.name])
+    
+    def test_quiz_results_view_multiple_choice_words_from_quiz_session(self):
+        self.client.force_login(self.test_user)
+        words = list(WordInfo.objects.filter(blocks__slug='test-block'))
+        questions = QuizBuilder(Block.objects.first(), words).multiple_choice()
+        quiz_session = QuizSession.from_questions('multiple_choice', Block.objects.first(), self.test_user, questions, words)
+        quiz_session.save()
+        request_data = dict(
+            self.request_data, quiz_type='multiple_choice', quiz_session=quiz_session.session_id,
+            quiz_words=','.join(str(word.id) for word in words),
+        )
+
+        response = self.client.post(self.url, data=request_data)
+
+        self.assertEqual(
+            [word.id for word in response.context['quiz_words']],
+            list(UserWord.objects.filter(user=self.test_user).order_by('word_id').values_list('id', flat=True)),
+        )
+
     def test_quiz_results_view_no_words_supplied(self):
         response = self.client.post(self.url, data=self.request_data)
         
@@ -6,9 +6,12 @@ urlpatterns = [
     path('learn/', QuizLearnView.as_view(), name='quiz_learn'),
     path('multiple_choice/', QuizMultipleChoiceView.as_view(), name='quiz_multiple_choice'),
     path('review/', QuizReviewView.as_view(), name='quiz_review'),
+    path('shell/<str:quiz_type>/', QuizShellView.as_view(), name='quiz_shell'),
+    path('questions/', QuizQuestionsView.as_view(), name='quiz_questions'),
     
     path('add_to_learned/', add_to_learned, name='add_to_learned'),
     path('check_answer/', CheckAnswerView.as_view(), name='check_answer'),
+    path('submit_answers/', submit_answers, name='submit_answers'),
     
     path('results/', QuizResultsView.as_view(), name='quiz_results'),
 ]
@@ -1,28 +1,37 @@
+import json
+import uuid
 from random import sample
 
-from django.http import JsonResponse
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
 
+from accounts.models import CustomUser, Profile
 from word_bank.models import UserWord, WordInfo
 
+from .models import QuizSubmission
 
-def update_user_word_points(user_answer: str, correct_answer: str, user_word: UserWord, increase_by=1, decrease_by=1) -> bool:
-    if user_answer == correct_answer:
-        is_correct = True
-        user_word.points = min(100, user_word.points + increase_by)
 
-    else:
-        is_correct = False
-        user_word.points = max(0, user_word.points - decrease_by)
-        
-    user_word.save()
-    return is_correct
+QUIZ_POINTS = {
+    # quiz type: (points for a correct answer, points lost for a wrong one)
+    'multiple_choice': (2, 1),
+    'review': (1, 1),
+}
+
+
+def lock_user_words(user):
+    """
+    Serialize the quiz writes of the user by locking the profile row until the end of the transaction,
+    so that every word learned by concurrent requests is counted once in block progress.
+    """
+    list(Profile.objects.select_for_update().filter(user=user).values_list('pk', flat=True))
 
 
 def update_profile_experience(user, increase_by=1):
-    user_profile = user.profile
-    user_profile.experience += increase_by
-    user_profile.save()
+    experience = Profile.objects.add_experience(user, increase_by)
+    if experience is not None and CustomUser.profile.is_cached(user):
+        user.profile.experience = experience
+    return experience
 
 
 @require_POST
@@ -34,16 +43,11 @@ def add_to_learned(request):
     json_data = dict()
     
     if user.is_authenticated:
-        user_profile = user.profile
-        user_word, created = UserWord.objects.get_or_create(
-            user=user,
-            word=word
-        )
-        user_word.points += int(created)
-        if created:
-            update_profile_experience(user, increase_by=1)
-
-        user_word.save()
+        with transaction.atomic():
+            lock_user_words(user)
+            user_word, created = UserWord.objects.upsert(user, word, points=1)
+            if created:
+                update_profile_experience(user, increase_by=1)
         json_data = {
             'created': created,
             'user_word_id': user_word.id,
@@ -53,23 +57,12 @@ def add_to_learned(request):
 
 
 def check_answer_multiple_choice(request):
+    # Immediate feedback only, points are committed with submit_answers at the end of the quiz
     question_id = request.POST.get('question_id')
     word = WordInfo.objects.get(pk=question_id)
     
     user_answer = request.POST.get('answer')
-    correct_answer = word.translation
-    user = request.user
-    if user.is_authenticated:
-        user_word, created = UserWord.objects.get_or_create(
-            user=user,
-            word=word
-        )
-        is_correct = update_user_word_points(user_answer, correct_answer, user_word, increase_by=2, decrease_by=1)
-        if is_correct:
-            update_profile_experience(user, increase_by=2)
-    else:
-        is_correct = user_answer == correct_answer
-    
+    is_correct = user_answer == word.translation
     example_span = populate_example_span(word) if is_correct else ''
 
     return JsonResponse({
@@ -79,21 +72,14 @@ def check_answer_multiple_choice(request):
 
 
 def check_answer_review(request):
+    # Immediate feedback only, points are committed with submit_answers at the end of the quiz
     question_id = request.POST.get('question_id')
-    user = request.user
-    user_word = UserWord.objects.get(pk=question_id, user=user)
-    word = WordInfo.objects.get(pk=user_word.word_id)
+    user_word = UserWord.objects.select_related('word').get(pk=question_id, user=request.user)
+    word = user_word.word
 
     user_answer = request.POST.get('answer')
-    correct_answer = word.translation
-
-    is_correct = update_user_word_points(user_answer, correct_answer, user_word, increase_by=1, decrease_by=1)
-    if is_correct:
-        example_span = populate_example_span(word)
-        update_profile_experience(user, increase_by=1)
-
-    else:
-        example_span = ''
+    is_correct = user_answer == word.translation
+    example_span = populate_example_span(word) if is_correct else ''
             
     return JsonResponse({
         'is_correct': is_correct,
@@ -101,6 +87,93 @@ def check_answer_review(request):
     })
 
 
+def apply_answers(user, quiz_type: str, answers: list) -> tuple:
+    """
+    Grade (question_id, answer) pairs in the order they were given, then apply the summed point change
+    of every word and the experience gained with one atomic update each. Should be called inside a transaction.
+    Return a list with is_correct (None for unknown questions) of every answer and the experience gained.
+    """
+    increase_by, decrease_by = QUIZ_POINTS[quiz_type]
+    question_ids = {question_id for question_id, answer in answers}
+    user_words = UserWord.objects.filter(user=user).select_related('word').only('id', 'word_id', 'word__translation')
+    lock_user_words(user)
+
+    if quiz_type == 'multiple_choice':
+        # Questions are words, the ones the user hasn't learned yet start with 0 points
+        word_ids = set(WordInfo.objects.filter(pk__in=question_ids).values_list('id', flat=True))
+        new_word_ids = word_ids - set(user_words.filter(word_id__in=word_ids).values_list('word_id', flat=True))
+        UserWord.objects.bulk_create([UserWord(user=user, word_id=word_id) for word_id in new_word_ids], ignore_conflicts=True)
+        user_words = {user_word.word_id: user_word for user_word in user_words.filter(word_id__in=question_ids)}
+        created_ids = {user_words[word_id].id for word_id in new_word_ids}
+    else:
+        user_words = {user_word.id: user_word for user_word in user_words.filter(pk__in=question_ids)}
+        created_ids = set()
+
+    results = []
+    experience = 0
+    points_changes = dict()
+    for question_id, answer in answers:
+        user_word = user_words.get(question_id)
+        if user_word is None:
+            results.append(None)
+            continue
+        
+        is_correct = answer == user_word.word.translation
+        points_change = increase_by if is_correct else -decrease_by
+        points_changes[user_word.id] = points_changes.get(user_word.id, 0) + points_change
+        if is_correct:
+            experience += increase_by
+        results.append(is_correct)
+
+    # Bulk inserts do not send post_save, add_points counts the created words in block progress
+    UserWord.objects.filter(user=user).add_points(points_changes, created_ids=created_ids)
+    if experience:
+        update_profile_experience(user, increase_by=experience)
+
+    return results, experience
+
+
+@require_POST
+def submit_answers(request):
+    """
+    Commit every answer of a quiz at once. Resubmitting the same quiz_id
+    returns the stored results without applying the answers again.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    quiz_type = request.POST.get('quiz_type')
+    try:
+        quiz_id = uuid.UUID(request.POST.get('quiz_id', ''))
+        answers = [
+            (int(answer['question_id']), str(answer['answer']))
+            for answer in json.loads(request.POST.get('answers', ''))
+        ]
+    except (ValueError, TypeError, KeyError):
+        return HttpResponse(status=400)
+    if quiz_type not in QUIZ_POINTS:
+        return HttpResponse(status=400)
+
+    with transaction.atomic():
+        submission, created = QuizSubmission.objects.get_or_create(
+            quiz_id=quiz_id,
+            defaults={'user': user, 'quiz_type': quiz_type},
+        )
+        if submission.user_id != user.id:
+            return HttpResponse(status=409)
+        if created:
+            submission.results, submission.experience_gained = apply_answers(user, quiz_type, answers)
+            submission.save(update_fields=['results', 'experience_gained'])
+
+    return JsonResponse({
+        'quiz_id': str(submission.quiz_id),
+        'created': created,
+        'results': submission.results,
+        'experience_gained': submission.experience_gained,
+    })
+
+
 def populate_example_span(word):
     example_span = ''
     word_example = word.example if word.example else None
@@ -115,17 +188,20 @@ def populate_example_span(word):
     return example_span
 
 
-def shuffle_questions_order(words: list, n_questions=None):
-    if not words or not isinstance(words, list):
+def sample_question_indices(pool_size: int, n_questions=None) -> list:
+    """
+    Indices into a pool of pool_size items for n_questions questions in random order.
+    Without n_questions up to 10 distinct items are drawn, otherwise n_questions is kept between 1 and 100
+    and items are repeated when the pool is smaller. Only the sampled indices are built, the pool is never copied.
+    """
+    if pool_size <= 0:
         return []
-    
+
     if n_questions is None:
-        n_questions = min(10, len(words))
+        n_questions = min(10, pool_size)
     else:
         n_questions = min(100, max(1, n_questions))
-        if n_questions > len(words):
-            repetition_factor = (n_questions // len(words) + 1)
-            words *= repetition_factor
-        
-    shuffled_words = sample(words, n_questions)
-    return shuffled_words
+
+    # Sampling over just enough virtual copies of the pool keeps items distinct until the pool is exhausted
+    repetition_factor = -(-n_questions // pool_size)
+    return [index % pool_size for index in sample(range(pool_size * repetition_factor), n_questions)]
@@ -1,117 +1,145 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse
-from django.shortcuts import render
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 from django.views.generic import View
 
 from geogem.gui_messages import get_gui_messages
+from word_bank.catalogue import get_block, get_block_words
 from word_bank.models import Block, UserWord, WordInfo
 
+from .quiz_builder import QuizBuilder
+from .quiz_session import QuizSession
 from .utils import *
 
 
-class QuizMultipleChoiceView(View):
-    template_name = 'quizzer/quiz_multiple_choice.html'
-    gui_messages = get_gui_messages(['base', 'quiz'])
-    
+# The quiz shell holds no question or user data and only changes with deployments
+QUIZ_SHELL_MAX_AGE = 60 * 60 * 24 * 7
+
+
+class QuizView(View):
+    """Quiz rendered on the server with all of its questions."""
+    quiz_type = None
+    template_name = None
+    empty_template_name = 'quizzer/quiz_empty.html'
+    gui_messages_keys = ['base', 'quiz']
+
     def post(self, request):
         learning_block = request.POST.get('learning_block')
-        block = Block.objects.get(slug=learning_block)
-        block_words = WordInfo.objects.filter(blocks=block)
-        for word in block_words:
-            word.generate_options(block, n_wrong=3)
+        try:
+            block = get_block(learning_block)
+        except Block.DoesNotExist:
+            raise Http404
+        builder = QuizBuilder(block, get_block_words(block))
 
-        words = shuffle_questions_order(list(block_words))
-        if not words:
-            return render(request, "quizzer/quiz_empty.html")
+        questions = builder.build(self.quiz_type, request.user)
+        if not questions and self.empty_template_name:
+            return render(request, self.empty_template_name, context={'gui_messages': get_gui_messages(self.gui_messages_keys)})
 
+        quiz_session = QuizSession.from_questions(self.quiz_type, block, request.user, questions, builder.words)
+        quiz_session.save()
         context = {
-            'gui_messages': self.gui_messages,
+            'gui_messages': get_gui_messages(self.gui_messages_keys),
             'learning_block': block,
-            'words': words
+            'questions': questions,
+            'quiz_session_id': quiz_session.session_id,
         }
 
         return render(request, self.template_name, context=context)
 
 
-class QuizLearnView(View):
-    template_name = 'quizzer/quiz_learn.html'
-    gui_messages = get_gui_messages(['base', 'quiz'])
-    
-    def post(self, request):
-        num_questions = 5
-        learning_block = request.POST.get('learning_block')
-        block = Block.objects.get(slug=learning_block)
-        words = WordInfo.objects.filter(blocks=block)
-        user = request.user
+class QuizMultipleChoiceView(QuizView):
+    quiz_type = 'multiple_choice'
+    template_name = 'quizzer/quiz_multiple_choice.html'
 
-        if user.is_authenticated:
-            learned_words = UserWord.objects.filter(word__blocks=block, user=user)
-            words_to_learn = words.exclude(id__in=learned_words.values_list('word', flat=True))
-            words_to_learn = shuffle_questions_order(list(words_to_learn), num_questions)
-            
-            context = {
-                'learning_block': block,
-                'words': words_to_learn,
-            }
 
-        else:
-            context = {
-                'learning_block': block,
-                'words': words,
-            }
-        context['gui_messages'] = self.gui_messages
-        return render(request, self.template_name, context=context)
+class QuizLearnView(QuizView):
+    quiz_type = 'learn'
+    template_name = 'quizzer/quiz_learn.html'
+    # The learn page tells users who learned every word of the block themselves
+    empty_template_name = None
     
     
-class QuizReviewView(LoginRequiredMixin, View):
+class QuizReviewView(LoginRequiredMixin, QuizView):
+    quiz_type = 'review'
     template_name = 'quizzer/quiz_review.html'
-    gui_messages = get_gui_messages(['base', 'quiz'])
-    
-    def post(self, request):
-        learning_block = request.POST.get('learning_block')
-        block = Block.objects.get(slug=learning_block)
-        user_words = UserWord.objects.filter(word__blocks=block, user=request.user)
-
-        review_words = []
-        for word in user_words:
-            # Generate wrong options for each word in user_words
-            info_word = WordInfo.objects.get(pk=word.word.id)
-            info_word.generate_options(block, n_wrong=3)
-            word.options = info_word.options
-            review_words.append(word)
-        
-        words = shuffle_questions_order(list(review_words))
-        if not words:
-            return render(request, "quizzer/quiz_empty.html")
-        
-        distinct_words = set(words)
+
+
+@method_decorator(cache_control(public=True, max_age=QUIZ_SHELL_MAX_AGE), name='dispatch')
+class QuizShellView(View):
+    """
+    Layout of the multiple choice and review quizzes without any question or user data,
+    so that browsers keep it across quizzes. Questions are fetched from QuizQuestionsView.
+    """
+    template_name = 'quizzer/quiz_shell.html'
+    gui_messages_keys = ['base', 'quiz']
+
+    def get(self, request, quiz_type):
+        if quiz_type not in QuizQuestionsView.quiz_types:
+            raise Http404
         context = {
-            'gui_messages': self.gui_messages,
-            'learning_block': block,
-            'words': words,
-            'distinct_words': distinct_words,
+            'gui_messages': get_gui_messages(self.gui_messages_keys),
+            'quiz_type': quiz_type,
         }
-
         return render(request, self.template_name, context=context)
+
+
+class QuizQuestionsView(View):
+    """
+    Questions of a new quiz for the quiz shell, as [id, prompt, options, audio_url] records.
+    Question ids are word ids for the multiple choice quiz and user word ids for the review quiz.
+    """
+    quiz_types = ('multiple_choice', 'review')
+
+    def post(self, request):
+        quiz_type = request.POST.get('quiz_type')
+        if quiz_type not in self.quiz_types:
+            return HttpResponse(status=400)
+        if quiz_type == 'review' and not request.user.is_authenticated:
+            return HttpResponse(status=403)
+
+        try:
+            n_questions = request.POST.get('n_questions')
+            n_questions = int(n_questions) if n_questions else None
+        except ValueError:
+            return HttpResponse(status=400)
+
+        try:
+            block = get_block(request.POST.get('learning_block'))
+        except Block.DoesNotExist:
+            raise Http404
+
+        builder = QuizBuilder(block, get_block_words(block))
+        questions = builder.build(quiz_type, request.user, n_questions)
+        quiz_session_id = None
+        if questions:
+            quiz_session = QuizSession.from_questions(quiz_type, block, request.user, questions, builder.words)
+            quiz_session.save()
+            quiz_session_id = quiz_session.session_id
+
+        return JsonResponse({
+            'quiz_type': quiz_type,
+            'quiz_session': quiz_session_id,
+            'learning_block': {'slug': block.slug, 'name': block.name},
+            'questions': [question.to_record() for question in questions],
+        })
     
 
 class QuizResultsView(View):
     template_name = 'quizzer/quiz_results.html'
-    gui_messages = get_gui_messages(
-        ['base', 'quiz_results', 'block_detail', 'column_titles', 'tooltips']
-    )
+    gui_messages_keys = ['base', 'quiz_results', 'block_detail', 'column_titles', 'tooltips']
     
     def post(self, request):
         user = request.user
         learning_block_slug = request.POST.get('learning_block')
-        block = Block.objects.get(slug=learning_block_slug)
-        block.is_completed = block.is_fully_learned(user)
+        block = get_object_or_404(Block.objects.with_progress(user).for_card(), slug=learning_block_slug)
         quiz_type = request.POST.get('quiz_type')
 
         quiz_words_ids = request.POST.get('quiz_words') or ''
         if not quiz_words_ids:
             context = {
-                'gui_messages': self.gui_messages,
+                'gui_messages': get_gui_messages(self.gui_messages_keys),
                 'learning_block': block,
                 'quiz_type': quiz_type,
                 'quiz_words': [],
@@ -122,17 +150,29 @@ class QuizResultsView(View):
         quiz_score = int(request.POST.get('quiz_score'))
         num_questions = request.POST.get('num_questions')        
 
-        quiz_user_words = []
-        for word_id in quiz_words_ids:
+        quiz_session = QuizSession.load(request.POST.get('quiz_session'), user)
+        if quiz_session is not None:
+            # Words are served from the quiz session, only points are loaded for authenticated users.
+            # Multiple choice questions are words, the other quizzes send user word ids
             if user.is_authenticated:
-                word = UserWord.objects.get(pk=word_id, user=user)
+                lookup = 'word_id' if quiz_session.quiz_type == 'multiple_choice' else 'id'
+                quiz_user_words = quiz_session.get_user_words(user, quiz_words_ids, lookup=lookup)
             else:
-                word = WordInfo.objects.get(pk=word_id)
-
-            quiz_user_words.append(word)
+                quiz_user_words = [quiz_session.get_word(word_id) for word_id in quiz_words_ids]
+                quiz_user_words = [word for word in quiz_user_words if word is not None]
+        else:
+            if user.is_authenticated:
+                words = UserWord.objects.filter(user=user).for_table()
+            else:
+                words = WordInfo.objects.for_quiz()
             
+            # Fetch all words at once and restore the quiz order (with repeated questions),
+            # skipping ids that don't exist or belong to another user
+            words_by_id = words.in_bulk(set(quiz_words_ids))
+            quiz_user_words = [words_by_id[word_id] for word_id in quiz_words_ids if word_id in words_by_id]
+        
         context = {
-            'gui_messages': self.gui_messages,
+            'gui_messages': get_gui_messages(self.gui_messages_keys),
             'learning_block': block,
             'quiz_type': quiz_type,
             'quiz_words': quiz_user_words,
@@ -150,10 +190,21 @@ class CheckAnswerView(View):
     
     def post(self, request):
         quiz_type = request.POST.get('quiz_type')
-        
-        try:
-            return self.quiz_type_functions[quiz_type](request)
-        
-        except KeyError:
+        if quiz_type not in self.quiz_type_functions:
             return HttpResponse(status=400)
+
+        quiz_session = QuizSession.load(request.POST.get('quiz_session'), request.user)
+        if quiz_session is not None and quiz_session.quiz_type == quiz_type:
+            try:
+                result = quiz_session.check_answer(int(request.POST.get('question_id')), request.POST.get('answer'))
+            except (TypeError, ValueError):
+                return HttpResponse(status=400)
+            if result is not None:
+                is_correct, example_span = result
+                return JsonResponse({
+                    'is_correct': is_correct,
+                    'example_span': example_span
+                })
+
+        return self.quiz_type_functions[quiz_type](request)
     
\ No newline at end of file
@@ -1,7 +1,31 @@
 $(document).ready(function() {
     activateTooltips();
+    fillCsrfInputs();
 });
 
+// Cached pages and fragments are rendered without a CSRF token, fill it in from the cookie
+function fillCsrfInputs() {
+    const csrfInputs = $('input[name="csrfmiddlewaretoken"][data-csrf-placeholder]');
+    if (!csrfInputs.length) {
+        return;
+    }
+    getCsrfToken(function (csrfToken) {
+        csrfInputs.val(csrfToken);
+    });
+}
+
+// Pass the CSRF token to callback, from the cookie or from the server when there is none yet
+function getCsrfToken(callback) {
+    const csrfCookie = document.cookie.split('; ').find((cookie) => cookie.startsWith('csrftoken='));
+    if (csrfCookie) {
+        callback(csrfCookie.split('=')[1]);
+    } else {
+        $.get(csrfTokenUrl, function (data) {
+            callback(data.csrf_token);
+        });
+    }
+}
+
 // Activate bootstrap tooltips
 function activateTooltips() {
     var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'))
@@ -2,6 +2,11 @@ const numQuestions = document.getElementById('num_questions').textContent;
 let learnedWordsIds = new Set();
 let incorrectlyAnswered = [];
 let quizScore = 0;
+// Questions of the quiz are kept on the server, answers are checked against them
+const quizSessionId = JSON.parse(document.getElementById('quiz_session_id').textContent);
+// Answers are committed in one batch when the quiz ends, the quiz ID makes resubmission harmless
+const quizId = crypto.randomUUID();
+let quizAnswers = [];
 let x, y;
 
 // Get mouse position when interacting with the question_form_review
@@ -20,12 +25,14 @@ function handleOptionsQuiz(questionForm, quizType) {
     
     let clickedInput = questionForm.find('input[type="submit"]:focus');
     let answerValue = clickedInput.val();
+    quizAnswers.push({'question_id': questionId, 'answer': answerValue});
     
     $.ajax({
         type: "POST",
         url: questionForm.attr('action'),
         data: {
             'quiz_type': quizType,
+            'quiz_session': quizSessionId,
             'question_id': questionId,
             'answer': answerValue,
             'csrfmiddlewaretoken': questionForm.find('input[name="csrfmiddlewaretoken"]').val()
@@ -161,5 +168,23 @@ function quizResults(quizType) {
     $("<input>", { name: "quiz_score", value: quizScore }).appendTo(resultsForm);
     $("<input>", { name: "num_questions", value: numQuestions }).appendTo(resultsForm);
     $("<input>", { name: "quiz_type", value: quizType }).appendTo(resultsForm);
-    resultsForm.submit();
+    $("<input>", { name: "quiz_session", value: quizSessionId }).appendTo(resultsForm);
+
+    if (quizType == 'learn' || !quizAnswers.length) {
+        resultsForm.submit();
+        return;
+    }
+    $.ajax({
+        type: "POST",
+        url: resultsForm.data('submit-answers-url'),
+        data: {
+            'quiz_id': quizId,
+            'quiz_type': quizType,
+            'answers': JSON.stringify(quizAnswers),
+            'csrfmiddlewaretoken': resultsForm.find('input[name="csrfmiddlewaretoken"]').val()
+        },
+        complete: function () {
+            resultsForm.submit();
+        }
+    })
 }
@@ -0,0 +1,84 @@
+// Quiz shell: the page is cached by the browser, only the questions of each quiz are fetched.
+// The block slug comes in the URL fragment, so every block shares the same cached page.
+const quizContainer = document.getElementById("quiz");
+const quizType = quizContainer.dataset.quizType;
+const learningBlockSlug = decodeURIComponent(window.location.hash.slice(1));
+
+getCsrfToken(function (csrfToken) {
+    $.post(quizContainer.dataset.questionsUrl, {
+        'quiz_type': quizType,
+        'learning_block': learningBlockSlug,
+        'csrfmiddlewaretoken': csrfToken
+    }, function (data) {
+        renderQuiz(data, csrfToken);
+    }).fail(function (xhr) {
+        if (xhr.status == 403) {
+            window.location.href = `${quizContainer.dataset.loginUrl}?next=${encodeURIComponent(window.location.pathname + window.location.hash)}`;
+        } else {
+            $("#quiz-empty").show();
+        }
+    });
+});
+
+function renderQuiz(data, csrfToken) {
+    if (!data.questions.length) {
+        $("#quiz-empty").show();
+        return;
+    }
+
+    $("#num_questions").text(JSON.stringify(data.questions.length));
+    $("#learning_block").text(JSON.stringify(data.learning_block.slug));
+    $("#quiz_session_id").text(JSON.stringify(data.quiz_session));
+    $("#quiz-title").text(data.learning_block.name);
+
+    const questions = data.questions.map((question, index) => renderQuestion(question, index + 1, data.questions.length));
+    $("#quiz-questions").append(questions);
+    $('#quiz input[name="csrfmiddlewaretoken"]').val(csrfToken);
+
+    // quiz.js binds to the rendered questions when it runs
+    const quizScript = document.createElement("script");
+    quizScript.src = quizContainer.dataset.quizScript;
+    document.body.append(quizScript);
+}
+
+function renderQuestion([questionId, prompt, options, audioUrl], counter, numQuestions) {
+    const question = $($("#question-template").html());
+    const isFirst = counter == 1;
+    const isLast = counter == numQuestions;
+
+    question.attr("id", `word${counter}`).toggleClass("display-none", !isFirst);
+    question.find("form").attr("id", counter).addClass(`question_form_${quizType}`);
+    question.find('input[name="question_id"]').val(questionId);
+    question.find(".question-counter").text(`${counter} / ${numQuestions}`);
+    question.find(".word_name").text(prompt);
+    question.find(".question_options").attr("id", `question${counter}_options`).append(options.map(renderOption));
+    question.find(".word_example").attr("id", `span_word_example_${counter}`);
+
+    const audio = question.find("audio");
+    const audioLink = question.find(".word-audio-link");
+    if (audioUrl) {
+        audio.attr("src", audioUrl);
+        audioLink.attr("href", audioUrl).on("click", function (e) {
+            e.preventDefault();
+            audio[0].play();
+        });
+    } else {
+        audio.remove();
+        audioLink.remove();
+    }
+
+    question.find(".btn-previous").prop("hidden", isFirst);
+    if (isLast) {
+        question.find("#btn-next").remove();
+        question.find(".btn-end-quiz").on("click", () => quizResults(quizType));
+    } else {
+        question.find(".btn-end-quiz").remove();
+    }
+    return question;
+}
+
+function renderOption(option) {
+    const optionRow = $($("#option-template").html());
+    optionRow.find("input").val(option);
+    return optionRow;
+}
@@ -0,0 +1,63 @@
+// Infinite scroll of the user words tables: the next page is loaded when its placeholder becomes visible
+const userWordsNextPage = document.getElementById("user-words-next-page");
+
+if (userWordsNextPage) {
+    let nextPageUrl = userWordsNextPage.dataset.url;
+    let isLoading = false;
+    let rowCount = $("#user-words-rows").children().length;
+
+    const observer = new IntersectionObserver(function (entries) {
+        if (entries[0].isIntersecting && nextPageUrl && !isLoading) {
+            loadNextPage();
+        }
+    });
+    observer.observe(userWordsNextPage);
+
+    function loadNextPage() {
+        isLoading = true;
+        $.getJSON(nextPageUrl, function (data) {
+            data.user_words.forEach(appendUserWordRow);
+            if (data.next_cursor) {
+                const url = new URL(nextPageUrl, window.location.href);
+                url.searchParams.set("cursor", data.next_cursor);
+                nextPageUrl = url.toString();
+            } else {
+                nextPageUrl = null;
+                observer.disconnect();
+            }
+        }).always(function () {
+            isLoading = false;
+        });
+    }
+
+    function appendUserWordRow(userWord) {
+        const rows = $("#user-words-rows");
+        const row = $("<tr>").append(
+            $("<th scope='row'>").text(++rowCount),
+            $("<td>").text(userWord.name),
+            $("<td>").append(userWord.audio ? audioLink(userWord) : null),
+            $("<td>").text(userWord.points),
+            $("<td>").text(userWord.mastery_level),
+            $("<td>").text(userWord.transliteration),
+            $("<td>").text(userWord.translation),
+            $("<td>").text(userWord.example || "-"),
+        );
+
+        const table = rows.closest("table");
+        if ($.fn.dataTable && $.fn.dataTable.isDataTable(table)) {
+            table.DataTable().row.add(row[0]).draw(false);
+        } else {
+            rows.append(row);
+        }
+    }
+
+    function audioLink(userWord) {
+        const audio = $("<audio preload='none'>").attr("src", userWord.audio);
+        const link = $("<a>").attr("href", userWord.audio).append($("<i class='fa-regular fa-circle-play'>"));
+        link.on("click", function (e) {
+            e.preventDefault();
+            audio[0].play();
+        });
+        return [audio, link];
+    }
+}
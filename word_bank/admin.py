@@ -24,27 +24,12 @@ class AdvancedUserWordMasteryLevelListFilter(admin.SimpleListFilter):
     
     def lookups(self, request, model_admin):
         # Only show mastery levels that UserWords have
-        exp_levels = [str(i) for i in range(7)]
-        qs = model_admin.get_queryset(request)
-        exp_needed = EXP_NEEDED_BY_WORD_MASTERY_LEVEL
-        for i in range(len(exp_needed) - 1):
-            if qs.filter(points__gte=exp_needed[i], points__lt=exp_needed[i+1]).exists():
-                yield (exp_levels[i], exp_levels[i])
+        levels = model_admin.get_queryset(request).order_by('mastery_level').values_list('mastery_level', flat=True).distinct()
+        return [(str(level), str(level)) for level in levels]
     
     def queryset(self, request, queryset):
         if self.value():
-            level = int(self.value())
-            max_mastery_level = len(EXP_NEEDED_BY_WORD_MASTERY_LEVEL) - 1
-            
-            if level < max_mastery_level:
-                queryset = queryset.filter(
-                    points__gte=EXP_NEEDED_BY_WORD_MASTERY_LEVEL[level],
-                    points__lt=EXP_NEEDED_BY_WORD_MASTERY_LEVEL[level+1]
-                )
-            elif level == max_mastery_level:
-                queryset = queryset.filter(
-                    points__gte=EXP_NEEDED_BY_WORD_MASTERY_LEVEL[level]
-                )   
+            queryset = queryset.filter(mastery_level=int(self.value()))
         return queryset
 
 
@@ -74,6 +59,13 @@ class UserWordAdmin(admin.ModelAdmin):
     ordering = ['-updated_at', 'user', 'points']
 
 
+class BlockProgressAdmin(admin.ModelAdmin):
+    list_display = ['user', 'block', 'learned_count', 'points_sum', 'updated_at']
+    list_filter = ['block', 'user']
+    ordering = ['-updated_at']
+
+
 admin.site.register(Block, BlockAdmin)
 admin.site.register(WordInfo, WordInfoAdmin)
 admin.site.register(UserWord, UserWordAdmin)
+admin.site.register(BlockProgress, BlockProgressAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class WordBankConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'word_bank'
+    
+    def ready(self):
+        from . import signals
@@ -0,0 +1,203 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from django.core.cache import caches
+from django.db import transaction
+
+from geogem.cache import bump_version, get_version, increment_version
+
+from .identity_map import get_identity_mapped
+from .models import Block, WordInfo
+
+
+CATALOGUE_CACHE_ALIAS = 'catalogue'
+CATALOGUE_VERSION_KEY = 'catalogue_version'
+CATALOGUE_TIMEOUT = 60 * 60 * 24
+CATALOGUE_LOCK_TIMEOUT = 30
+CATALOGUE_LOCK_WAIT = 5
+CATALOGUE_LOCK_POLL_INTERVAL = 0.05
+LOCAL_CATALOGUE_MAX_ENTRIES = 512
+LOCAL_CATALOGUE_TIMEOUT = 60 * 5
+
+# Version read from the shared cache during the current request, see CatalogueVersionMiddleware
+request_catalogue_state = ContextVar('request_catalogue_state', default=None)
+
+
+class LocalCache:
+    """
+    In-process LRU cache with a TTL, shared by the threads of a worker.
+    Values are copied on the way out so that callers can annotate model instances freely.
+    """
+    def __init__(self, max_entries=LOCAL_CATALOGUE_MAX_ENTRIES, timeout=LOCAL_CATALOGUE_TIMEOUT):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy_value(entry[1])
+
+    def set(self, key, value):
+        value = copy_value(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def copy_value(value):
+    if isinstance(value, list):
+        return [copy.copy(item) for item in value]
+    return copy.copy(value)
+
+
+local_catalogue_cache = LocalCache()
+shared_catalogue_stats = {'hits': 0, 'misses': 0, 'stale': 0}
+
+
+def get_catalogue_cache():
+    return caches[CATALOGUE_CACHE_ALIAS]
+
+
+def get_catalogue_stats() -> dict:
+    """Hit, miss and eviction counters of this worker."""
+    return {
+        'local': {
+            'hits': local_catalogue_cache.hits,
+            'misses': local_catalogue_cache.misses,
+            'evictions': local_catalogue_cache.evictions,
+            'entries': len(local_catalogue_cache),
+        },
+        'shared': dict(shared_catalogue_stats),
+    }
+
+
+def get_catalogue_version() -> int:
+    # Polled from the shared cache at most once per request, so edits made
+    # in another worker are seen from the next request on
+    state = request_catalogue_state.get()
+    if state is not None and 'version' in state:
+        return state['version']
+
+    version = get_version(CATALOGUE_VERSION_KEY, CATALOGUE_CACHE_ALIAS)
+    if state is not None:
+        state['version'] = version
+    return version
+
+
+def forget_request_catalogue_version():
+    state = request_catalogue_state.get()
+    if state is not None:
+        state.pop('version', None)
+
+
+def bump_catalogue_version():
+    increment_version(CATALOGUE_VERSION_KEY, CATALOGUE_CACHE_ALIAS)
+    forget_request_catalogue_version()
+
+
+def invalidate_catalogue():
+    """Make every cached block and word list stale, see bump_version."""
+    bump_version(CATALOGUE_VERSION_KEY, CATALOGUE_CACHE_ALIAS)
+    forget_request_catalogue_version()
+    transaction.on_commit(forget_request_catalogue_version)
+
+
+def get_shared(key, version, load, is_cacheable=None) -> tuple:
+    """
+    Read key from the shared cache with stale-while-revalidate: entries keep the catalogue
+    version they were built for, and once it is outdated a single caller (holding a cache lock)
+    rebuilds it while the others keep getting the stale value. Concurrent misses without
+    any value wait for the lock holder instead of loading the same entry.
+    Returns (value, is_fresh).
+    """
+    cache = get_catalogue_cache()
+    entry = cache.get(key)
+    if entry is not None and entry[0] >= version:
+        shared_catalogue_stats['hits'] += 1
+        return entry[1], True
+
+    lock_key = f'lock:{key}:{version}'
+    if cache.add(lock_key, True, CATALOGUE_LOCK_TIMEOUT):
+        shared_catalogue_stats['misses'] += 1
+        try:
+            value = load()
+            if is_cacheable is None or is_cacheable(value):
+                cache.set(key, (version, value), CATALOGUE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return value, True
+
+    if entry is not None:
+        shared_catalogue_stats['stale'] += 1
+        return entry[1], False
+
+    deadline = time.monotonic() + CATALOGUE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(CATALOGUE_LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry[0] >= version:
+            shared_catalogue_stats['hits'] += 1
+            return entry[1], True
+        if cache.get(lock_key) is None:
+            # Released without storing a value: failed or not cacheable
+            break
+    # The lock holder is too slow or failed
+    shared_catalogue_stats['misses'] += 1
+    return load(), True
+
+
+def get_cached(key, load):
+    version = get_catalogue_version()
+    local_key = (version, key)
+    value = local_catalogue_cache.get(local_key)
+    if value is not None:
+        return value
+
+    value, is_fresh = get_shared(key, version, load)
+    # Stale values would otherwise stay in the local tier under the new version
+    if is_fresh:
+        local_catalogue_cache.set(local_key, value)
+    return value
+
+
+def get_block(slug) -> Block:
+    """
+    Block by slug, raises Block.DoesNotExist like Block.objects.get.
+    Within a request every lookup of the same version of the block returns the same instance.
+    """
+    key = f'block:{slug}'
+    return get_identity_mapped(
+        (get_catalogue_version(), key), lambda: get_cached(key, lambda: Block.objects.get(slug=slug))
+    )
+
+
+def get_block_words(block) -> list:
+    """Words of the block, callers get their own copies of the instances."""
+    return get_cached(f'block_words:{block.id}', lambda: list(WordInfo.objects.filter(blocks=block).for_quiz()))
+
@@ -1,4 +1,5 @@
 import math
+from itertools import accumulate
 from pprint import pprint
 
 
@@ -10,11 +11,9 @@ def calculate_level_increment(level):
 
     
 MAX_LEVEL = 100
-LEVEL_XP_INCREMENT = [calculate_level_increment(level) for level in range(1, MAX_LEVEL+1)]
-LEVEL_XP = {level: sum(LEVEL_XP_INCREMENT[:level]) for level in range(1, len(LEVEL_XP_INCREMENT)+1)}
-
-LEVEL_XP_INCREMENT.insert(0, 0)
-LEVEL_XP = {0: 0, **LEVEL_XP}
+LEVEL_XP_INCREMENT = [0] + [calculate_level_increment(level) for level in range(1, MAX_LEVEL+1)]
+# Total experience needed for each level, indexed by level
+LEVEL_XP = dict(enumerate(accumulate(LEVEL_XP_INCREMENT)))
 
 if __name__ == '__main__':
     pivot_xp_table = {level: (LEVEL_XP[level], LEVEL_XP_INCREMENT[level]) for level in LEVEL_XP.keys()}
@@ -0,0 +1,57 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .catalogue import get_catalogue_version, get_shared
+
+
+ANONYMOUS_PAGE_MAX_AGE = 60
+
+
+def is_anonymous_request(request) -> bool:
+    # Without a session cookie the user is anonymous, no need to load the session
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return True
+    return not request.user.is_authenticated
+
+
+def get_anonymous_page_cache_key(request) -> str:
+    # The cached views don't read query parameters, so they must not add entries
+    path_hash = hashlib.md5(request.path.encode()).hexdigest()
+    return f'anonymous_page:{request.LANGUAGE_CODE}:{path_hash}'
+
+
+def cache_anonymous_page(view_func):
+    """
+    Cache GET responses rendered for anonymous users by path and language,
+    under the catalogue version. Forms on these pages must use {% csrf_input %}
+    so that the token is filled in on the client. Logged-in users always get a fresh page.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD') or 'messages' in request.COOKIES
+                or not is_anonymous_request(request)):
+            response = view_func(request, *args, **kwargs)
+            patch_vary_headers(response, ['Cookie'])
+            patch_cache_control(response, private=True)
+            return response
+
+        def render_page():
+            request.cache_anonymous_page = True
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            return response
+
+        # Pages that set cookies (session, messages, CSRF) are specific to the visitor
+        response = get_shared(
+            get_anonymous_page_cache_key(request), get_catalogue_version(), render_page,
+            is_cacheable=lambda response: response.status_code == 200 and not response.cookies,
+        )[0]
+        patch_vary_headers(response, ['Cookie'])
+        patch_cache_control(response, public=True, max_age=ANONYMOUS_PAGE_MAX_AGE)
+        return response
+
+    return wrapper
@@ -0,0 +1,24 @@
+from contextvars import ContextVar
+
+
+# Objects loaded during the current request, see IdentityMapMiddleware.
+# A context variable rather than a request attribute so that it follows the request
+# into the threads and tasks serving it under both WSGI and ASGI
+request_identity_map = ContextVar('request_identity_map', default=None)
+
+
+def get_identity_mapped(key, load):
+    """
+    Return the object loaded for key earlier in the request, or load and remember it.
+    Outside of a request (commands, shell) load is called every time.
+    """
+    identity_map = request_identity_map.get()
+    if identity_map is None:
+        return load()
+
+    try:
+        return identity_map[key]
+    except KeyError:
+        value = identity_map[key] = load()
+        return value
+
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from word_bank.models import UserWord
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored UserWord mastery levels from points, in chunks of rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of rows updated per statement')
+
+    def handle(self, *args, **options):
+        num_updated = UserWord.objects.backfill_mastery_levels(chunk_size=options['chunk_size'])
+
+        self.stdout.write('Updated user word mastery levels:', ending=' ')
+        self.stdout.write(self.style.SUCCESS(str(num_updated)))
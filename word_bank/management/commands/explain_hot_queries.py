@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import CustomUser, CustomUserToken
+from word_bank.models import Block, UserWord, WordInfo
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the hot queries and reports whether they use the index intended for them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plan', action='store_true', help='Print the query plans')
+
+    def get_hot_queries(self) -> list:
+        """(label, queryset, table, leading columns of the intended index) of every hot query."""
+        # Plans may depend on the values, so use existing rows where there are any
+        user_id = UserWord.objects.values_list('user_id', flat=True).first() or CustomUser.objects.values_list('id', flat=True).first() or 0
+        block_id = Block.objects.values_list('id', flat=True).first() or 0
+        user_word_table = UserWord._meta.db_table
+        block_words_table = WordInfo.blocks.through._meta.db_table
+
+        return [
+            (
+                'User words in a block',
+                UserWord.objects.filter(user_id=user_id, word__blocks=block_id),
+                block_words_table, ['wordinfo_id', 'block_id'],
+            ),
+            (
+                'User words by date added',
+                UserWord.objects.filter(user_id=user_id).order_by('-added_at', '-id'),
+                user_word_table, ['user_id', 'added_at'],
+            ),
+            (
+                'Block words by date updated',
+                WordInfo.objects.filter(blocks=block_id).order_by('-updated_at'),
+                block_words_table, ['block_id'],
+            ),
+            (
+                'Expired tokens',
+                CustomUserToken.objects.filter(expire_date__lte=timezone.now()),
+                CustomUserToken._meta.db_table, ['expire_date'],
+            ),
+        ]
+
+    def get_intended_indexes(self, table, columns) -> list:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        return [
+            name for name, constraint in constraints.items()
+            if (constraint['index'] or constraint['unique']) and constraint['columns'][:len(columns)] == columns
+        ]
+
+    def handle(self, *args, **options):
+        for label, queryset, table, columns in self.get_hot_queries():
+            plan = queryset.explain()
+            intended_indexes = self.get_intended_indexes(table, columns)
+            used_indexes = [name for name in intended_indexes if name in plan]
+
+            self.stdout.write(f'{label}:', ending=' ')
+            if used_indexes:
+                self.stdout.write(self.style.SUCCESS(f'uses {", ".join(used_indexes)}'))
+            elif intended_indexes:
+                self.stdout.write(self.style.WARNING(f'does not use {", ".join(intended_indexes)}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'no index on {table} ({", ".join(columns)})'))
+            if options['plan']:
+                self.stdout.write(plan)
@@ -0,0 +1,17 @@
+from django.core.management.commands import loaddata
+
+from word_bank.models import BlockProgress, UserWord, WordInfo
+
+
+class RebuildBlockProgressMixin:
+    """Rebuild BlockProgress once the fixtures are loaded, progress signals skip raw fixture rows."""
+    progress_models = {BlockProgress, UserWord, WordInfo}
+
+    def loaddata(self, fixture_labels):
+        super().loaddata(fixture_labels)
+        if self.models & self.progress_models:
+            BlockProgress.objects.db_manager(self.using).rebuild()
+
+
+class Command(RebuildBlockProgressMixin, loaddata.Command):
+    pass
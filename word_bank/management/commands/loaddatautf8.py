@@ -0,0 +1,7 @@
+from django_dump_load_utf8.management.commands import loaddatautf8
+
+from .loaddata import RebuildBlockProgressMixin
+
+
+class Command(RebuildBlockProgressMixin, loaddatautf8.Command):
+    pass
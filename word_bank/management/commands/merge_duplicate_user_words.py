@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from word_bank.models import UserWord
+
+
+class Command(BaseCommand):
+    help = 'Merges duplicate UserWord rows of the same user and word, run before adding the unique_user_word constraint'
+
+    def handle(self, *args, **options):
+        num_deleted = UserWord.objects.merge_duplicates()
+
+        self.stdout.write('Deleted duplicate user words:', ending=' ')
+        self.stdout.write(self.style.SUCCESS(str(num_deleted)))
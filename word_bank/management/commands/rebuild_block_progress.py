@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from word_bank.models import BlockProgress
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds BlockProgress rows from UserWord instances'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Only rebuild progress of this user id')
+        parser.add_argument('--block', type=int, action='append', dest='blocks', help='Only rebuild progress in this block id')
+
+    def handle(self, *args, **options):
+        num_rows = BlockProgress.objects.rebuild(users=options['users'], blocks=options['blocks'])
+
+        self.stdout.write('Rebuilt block progress rows:', ending=' ')
+        self.stdout.write(self.style.SUCCESS(str(num_rows)))
@@ -0,0 +1,28 @@
+from .catalogue import request_catalogue_state
+from .identity_map import request_identity_map
+
+
+class CatalogueVersionMiddleware:
+    """Lets the catalogue version be read from the shared cache once per request."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request_catalogue_state.set(dict())
+        try:
+            return self.get_response(request)
+        finally:
+            request_catalogue_state.reset(token)
+
+
+class IdentityMapMiddleware:
+    """Keeps objects looked up during a request so that repeated lookups return the same instance."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request_identity_map.set(dict())
+        try:
+            return self.get_response(request)
+        finally:
+            request_identity_map.reset(token)
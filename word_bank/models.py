@@ -1,15 +1,97 @@
 import secrets
-from bisect import bisect_right
-from collections import Counter
-from datetime import datetime
+from collections import defaultdict
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Case, Count, F, IntegerField, Max, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.db.models.lookups import GreaterThanOrEqual
 from django.template.defaultfilters import slugify
 from django.urls import reverse
+from django.utils import timezone
 
 from accounts.models import CustomUser
+from geogem.db import update_returning
 
-from .utils import EXP_NEEDED_BY_WORD_MASTERY_LEVEL
+from .utils import (EXP_NEEDED_BY_WORD_MASTERY_LEVEL, MAX_WORD_POINTS,
+                    NUM_WORD_MASTERY_LEVELS, bump_progress_version,
+                    get_empty_mastery_histogram, get_mastery_summary,
+                    get_word_mastery_level)
+
+
+system_random = secrets.SystemRandom()
+
+
+def get_mastery_level_expression(points=None):
+    """Database counterpart of get_word_mastery_level, bucketing points (a field or an expression) with Case/When."""
+    points = F('points') if points is None else points
+    return Case(
+        *[
+            When(GreaterThanOrEqual(points, Value(min_points)), then=Value(level))
+            for level, min_points in reversed(list(enumerate(EXP_NEEDED_BY_WORD_MASTERY_LEVEL)))
+        ],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def with_mastery_level(values: dict) -> dict:
+    """Add the mastery_level matching the points written by an update, computed from the same expression."""
+    if 'points' in values and 'mastery_level' not in values:
+        points = values['points']
+        if hasattr(points, 'resolve_expression'):
+            values['mastery_level'] = get_mastery_level_expression(points)
+        else:
+            values['mastery_level'] = get_word_mastery_level(points)
+    return values
+
+
+def get_mastery_level_aggregates() -> dict:
+    return {
+        f'level_{level}': Count('id', filter=Q(mastery_level=level))
+        for level in range(NUM_WORD_MASTERY_LEVELS)
+    }
+
+
+class BlockQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        if user.is_staff:
+            return self
+
+        return self.filter(is_visible=True)
+    
+    def with_word_count(self):
+        block_words = WordInfo.blocks.through.objects.filter(
+            block_id=OuterRef('pk')
+        ).order_by().values('block_id').annotate(count=Count('id')).values('count')
+        return self.annotate(word_count=Coalesce(Subquery(block_words), 0))
+    
+    def with_progress(self, user):
+        """Annotate word_count, learned_count and is_completed for the user in a single query."""
+        queryset = self.with_word_count()
+        if not user.is_authenticated:
+            return queryset.annotate(learned_count=Value(0), is_completed=Value(False))
+
+        learned_count = BlockProgress.objects.filter(
+            user=user, block_id=OuterRef('pk')
+        ).values('learned_count')[:1]
+        return queryset.annotate(
+            learned_count=Coalesce(Subquery(learned_count), 0),
+            is_completed=Case(
+                When(word_count=F('learned_count'), then=Value(True)),
+                default=Value(False),
+            ),
+        )
+
+    # Projections loading only the columns their templates display
+
+    def for_card(self):
+        """Fields of the learn index block cards, without the theory."""
+        return self.only('id', 'name', 'slug', 'description')
+
+    def for_table(self):
+        """Fields of the staff blocks table."""
+        return self.only('id', 'name', 'slug', 'description', 'is_visible', 'added_at', 'updated_at')
 
 
 class Block(models.Model):
@@ -21,6 +103,8 @@ class Block(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_visible = models.BooleanField(default=False)
     
+    objects = BlockQuerySet.as_manager()
+    
     def __str__(self):
         return self.name
     
@@ -33,31 +117,38 @@ class Block(models.Model):
         super().save(*args, **kwargs)
     
         
-    def get_mastery_level(self, user):
+    def get_progress(self, user):
         if user.is_authenticated:
-            block_user_words = UserWord.objects.filter(word__blocks=self, user=user)
-            if block_user_words.exists():
-                user_word_levels = Counter(user_word.mastery_level for user_word in block_user_words)
-                user_word_levels.update({level: 0 for level in range(len(EXP_NEEDED_BY_WORD_MASTERY_LEVEL)) if level not in user_word_levels})
-                
-                numerator = sum(lvl * lvl_count for lvl, lvl_count in user_word_levels.items())
+            return BlockProgress.objects.filter(user=user, block=self).first()
 
-                num_block_words = WordInfo.objects.filter(blocks=self).count()
-                denominator = num_block_words
-                weighted_avg = numerator / denominator
-                return weighted_avg
+        return None
+    
+    def get_mastery_summary(self, user, num_block_words=None) -> dict:
+        progress = self.get_progress(user)
+        if progress is None or not progress.learned_count:
+            return get_mastery_summary()
 
-        return 0
+        if num_block_words is None:
+            num_block_words = WordInfo.objects.filter(blocks=self).count()
+        return progress.get_mastery_summary(num_block_words)
+    
+    def get_mastery_level(self, user):
+        return self.get_mastery_summary(user)['mastery_level']
     
     def is_fully_learned(self, user) -> bool:
         if user.is_authenticated:
-            block_words_length = WordInfo.objects.filter(blocks=self).count()
-            block_user_words_length = UserWord.objects.filter(word__blocks=self, user=user).count()
-            return block_words_length == block_user_words_length
+            blocks = Block.objects.with_progress(user).filter(pk=self.pk)
+            return blocks.values_list('is_completed', flat=True).get()
 
         return False
 
 
+class WordInfoQuerySet(models.QuerySet):
+    def for_quiz(self):
+        """Fields of the quiz templates and quiz sessions, without the word image and timestamps."""
+        return self.only('id', 'name', 'transliteration', 'translation', 'example', 'example_image', 'audio')
+
+
 class WordInfo(models.Model):
     name = models.CharField(max_length=100)
     transliteration = models.CharField(max_length=100)
@@ -69,6 +160,8 @@ class WordInfo(models.Model):
     blocks = models.ManyToManyField(Block)
     updated_at = models.DateTimeField(auto_now=True)
     added_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WordInfoQuerySet.as_manager()
     
     def __str__(self):
         return f'{self.name} - {self.translation}'
@@ -79,38 +172,359 @@ class WordInfo(models.Model):
     def example_short(self):
         example_length = len(self.example) if isinstance(self.example, str) else 0
         return self.example[:15] + '...' if example_length > 15 else self.example
+
+
+class BlockDistractors:
+    """
+    Translations of a block loaded once and shared by every question of a quiz.
+    Wrong options are drawn by sampling indices, so no list is copied per question.
+    """
+    def __init__(self, words):
+        self.translations = []
+        self.index_by_word_id = dict()
+        for index, word in enumerate(words):
+            self.translations.append(word.translation)
+            self.index_by_word_id[word.id] = index
+    
+    def sample(self, word_id, n_wrong=3) -> list:
+        excluded_index = self.index_by_word_id.get(word_id)
+        population_size = len(self.translations) - (excluded_index is not None)
+        indices = system_random.sample(range(population_size), min(n_wrong, population_size))
+        if excluded_index is not None:
+            # Skip over the correct answer without removing it from the list
+            indices = [index + (index >= excluded_index) for index in indices]
+        return [self.translations[index] for index in indices]
+
+
+class UserWordQuerySet(models.QuerySet):
+    def for_table(self):
+        """User words with the word fields of the user words and quiz results tables."""
+        return self.select_related('word').only(
+            'id', 'points', 'mastery_level', 'added_at', 'word',
+            'word__name', 'word__transliteration', 'word__translation', 'word__example', 'word__audio',
+        )
+
+    # mastery_level is stored next to points, every write path keeps them in sync.
+    # Writes bump the progress version of the affected users too, as they send no signals
+    def update(self, **kwargs):
+        user_ids = set()
+        if set(kwargs) - {'updated_at'}:
+            # Only touching updated_at changes nothing the cached block cards show
+            user_ids = set(self.order_by().values_list('user_id', flat=True).distinct())
+        num_updated = super().update(**with_mastery_level(kwargs))
+        if num_updated:
+            for user_id in user_ids:
+                bump_progress_version(user_id)
+        return num_updated
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.mastery_level = get_word_mastery_level(obj.points)
+        created_objs = super().bulk_create(objs, *args, **kwargs)
+        for user_id in {obj.user_id for obj in objs}:
+            bump_progress_version(user_id)
+        return created_objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if 'points' in fields and 'mastery_level' not in fields:
+            for obj in objs:
+                obj.mastery_level = get_word_mastery_level(obj.points)
+            fields = [*fields, 'mastery_level']
+        num_updated = super().bulk_update(objs, fields, *args, **kwargs)
+        for user_id in {obj.user_id for obj in objs}:
+            bump_progress_version(user_id)
+        return num_updated
+
+    def upsert(self, user, word, points=0) -> tuple:
+        """
+        Learn the word for the user, only touching updated_at if the user already has it.
+        The unique_user_word constraint makes concurrent calls safe. Return (user_word, created).
+        """
+        user_word, created = self.get_or_create(user=user, word=word, defaults={'points': points})
+        if not created:
+            user_word.updated_at = timezone.now()
+            self.filter(pk=user_word.pk).update(updated_at=user_word.updated_at)
+        return user_word, created
+
+    def merge_duplicates(self) -> int:
+        """
+        Collapse duplicate (user, word) rows into the earliest one, keeping the highest points.
+        Needs to be run before adding the unique_user_word constraint. Returns the number of deleted rows.
+        """
+        duplicates = self.values('user_id', 'word_id').annotate(
+            num_rows=Count('id'),
+            max_points=Max('points'),
+        ).filter(num_rows__gt=1).order_by()
+
+        num_deleted = 0
+        user_ids = set()
+        with transaction.atomic(using=self.db):
+            for duplicate in duplicates:
+                rows = self.filter(user_id=duplicate['user_id'], word_id=duplicate['word_id'])
+                kept = rows.order_by('added_at', 'id').first()
+                rows.filter(pk=kept.pk).update(points=duplicate['max_points'])
+                num_deleted += rows.exclude(pk=kept.pk).delete()[0]
+                user_ids.add(duplicate['user_id'])
+            if user_ids:
+                BlockProgress.objects.rebuild(users=user_ids)
+            for user_id in user_ids:
+                bump_progress_version(user_id)
+
+        return num_deleted
+
+    def add_points(self, points_changes: dict, created_ids=()) -> dict:
+        """
+        Atomically add points to user words, given as {user word id: points change (may be negative)},
+        with one UPDATE clamping them to 0..MAX_WORD_POINTS in the database.
+        The user words are locked first, so that block progress gets the exact deltas in the same transaction.
+        created_ids are user words just created without signals (bulk_create), counted as learned in block progress.
+        Return {user word id: new points}.
+        """
+        if not points_changes:
+            return dict()
+
+        points_change = Case(
+            *[When(pk=pk, then=Value(change)) for pk, change in points_changes.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        with transaction.atomic(using=self.db):
+            old_rows = {
+                pk: (user_id, word_id, points)
+                for pk, user_id, word_id, points in self.filter(pk__in=points_changes).select_for_update()
+                .order_by('pk').values_list('pk', 'user_id', 'word_id', 'points')
+            }
+            if not old_rows:
+                return dict()
+            new_points = dict(update_returning(
+                self.model._base_manager.filter(pk__in=old_rows), ['id', 'points'],
+                **with_mastery_level({
+                    'points': Least(
+                        Greatest(F('points') + points_change, Value(0)),
+                        Value(MAX_WORD_POINTS),
+                        output_field=models.PositiveIntegerField(),
+                    ),
+                    'updated_at': timezone.now(),
+                }),
+            ))
+            # Queryset updates don't send signals
+            BlockProgress.objects.record_user_words_change([
+                (user_id, word_id, None if pk in created_ids else old_points, new_points[pk])
+                for pk, (user_id, word_id, old_points) in old_rows.items()
+                if pk in created_ids or new_points[pk] != old_points
+            ])
+            for user_id in {user_id for user_id, word_id, old_points in old_rows.values()}:
+                bump_progress_version(user_id)
+
+        return new_points
+
+    def backfill_mastery_levels(self, chunk_size=1000) -> int:
+        """
+        Recompute stored mastery levels from points, updating chunk_size rows by primary key range
+        per statement so that large tables are not locked at once. Returns the number of rows fixed.
+        """
+        num_updated = 0
+        last_pk = 0
+        while True:
+            chunk_pks = list(self.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+            if not chunk_pks:
+                return num_updated
+
+            mastery_level = get_mastery_level_expression()
+            num_updated += self.filter(pk__gte=chunk_pks[0], pk__lte=chunk_pks[-1]).exclude(
+                mastery_level=mastery_level
+            ).update(mastery_level=mastery_level)
+            last_pk = chunk_pks[-1]
     
-    def generate_options(self, block, n_wrong=3):
-        self.options = [self.translation]
-        words = WordInfo.objects.filter(blocks=block).exclude(id=self.id)
-        words = list(words.values_list('translation', flat=True))
-        for _ in range(n_wrong):
-            try:
-                wrong_option = secrets.choice(words)
-                self.options.append(wrong_option)
-                words.remove(wrong_option)
-            except IndexError:
-                break
-            
-        self.options = sorted(self.options, key=lambda x: secrets.randbits(32))
-        return self.options
+    def get_mastery_summary(self, num_block_words=0) -> dict:
+        """Mastery level histogram of the user words, computed in a single aggregate query."""
+        level_counts = self.aggregate(**get_mastery_level_aggregates())
+        histogram = [level_counts[f'level_{level}'] for level in range(NUM_WORD_MASTERY_LEVELS)]
+        return get_mastery_summary(histogram, num_block_words)
 
 
 class UserWord(models.Model):
     word = models.ForeignKey(WordInfo, on_delete=models.CASCADE)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     points = models.PositiveIntegerField(default=0)
+    # Stored get_word_mastery_level(points) so that it can be filtered and aggregated in SQL
+    mastery_level = models.PositiveSmallIntegerField(default=0, editable=False)
     added_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UserWordQuerySet.as_manager()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'word'], name='unique_user_word'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'mastery_level'], name='userword_user_mastery_idx'),
+            models.Index(fields=['user', '-added_at', '-id'], name='userword_user_added_idx'),
+        ]
+    
     def __str__(self):
         return f'{self.user} - {self.word.name}'
-    
+
     def save(self, *args, **kwargs):
-        self.updated_at = datetime.now()
-        super(UserWord, self).save(*args, **kwargs)
+        self.mastery_level = get_word_mastery_level(self.points)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'points' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'mastery_level'}
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember loaded points so that block progress can be updated by delta
+        if 'points' in field_names:
+            instance._loaded_points = instance.points
+        return instance
+
+
+class BlockProgressManager(models.Manager):
+    def record_user_word_change(self, user_id, word_id, old_points=None, new_points=None):
+        """
+        Apply a change of a single UserWord to every block its word belongs to.
+        old_points is None when the word has just been learned,
+        new_points is None when the word has been removed.
+        """
+        block_ids = WordInfo.blocks.through.objects.filter(
+            wordinfo_id=word_id
+        ).values_list('block_id', flat=True)
+        with transaction.atomic():
+            for block_id in block_ids:
+                self._apply_change(user_id, block_id, old_points, new_points)
+    
+    def record_block_words_change(self, word_ids, block_ids, added=True):
+        """Add or subtract learned words when WordInfo.blocks membership changes."""
+        user_words = UserWord.objects.filter(word_id__in=word_ids).values_list('user_id', 'points')
+        with transaction.atomic():
+            for user_id, points in user_words:
+                for block_id in block_ids:
+                    if added:
+                        self._apply_change(user_id, block_id, new_points=points)
+                    else:
+                        self._apply_change(user_id, block_id, old_points=points)
+    
+    def record_user_words_change(self, changes):
+        """
+        Apply changes of many UserWords at once, given as (user_id, word_id, old_points, new_points)
+        with old_points None for words that have just been learned, locking the affected progress rows.
+        """
+        if not changes:
+            return
+
+        word_blocks = defaultdict(list)
+        for word_id, block_id in WordInfo.blocks.through.objects.filter(
+            wordinfo_id__in={word_id for user_id, word_id, old_points, new_points in changes}
+        ).values_list('wordinfo_id', 'block_id'):
+            word_blocks[word_id].append(block_id)
+
+        with transaction.atomic():
+            progress_rows = {
+                (progress.user_id, progress.block_id): progress
+                for progress in self.select_for_update().filter(
+                    user_id__in={user_id for user_id, word_id, old_points, new_points in changes},
+                    block_id__in={block_id for block_ids in word_blocks.values() for block_id in block_ids},
+                ).order_by('pk')
+            }
+            changed_progress = dict()
+            for user_id, word_id, old_points, new_points in changes:
+                for block_id in word_blocks[word_id]:
+                    progress = progress_rows.get((user_id, block_id))
+                    if progress is None:
+                        # First word of the user in the block
+                        progress_rows[user_id, block_id] = self._apply_change(user_id, block_id, old_points, new_points)
+                        continue
+                    if old_points is not None:
+                        progress.remove_word(old_points)
+                    progress.add_word(new_points)
+                    progress.updated_at = timezone.now()
+                    changed_progress[progress.pk] = progress
+            self.bulk_update(changed_progress.values(), ['learned_count', 'points_sum', 'mastery_levels', 'updated_at'])
+
+    def _apply_change(self, user_id, block_id, old_points=None, new_points=None):
+        if new_points is None:
+            progress = self.select_for_update().filter(user_id=user_id, block_id=block_id).first()
+            if progress is None:
+                return
+        else:
+            progress, created = self.select_for_update().get_or_create(user_id=user_id, block_id=block_id)
+
+        if old_points is not None:
+            progress.remove_word(old_points)
+        if new_points is not None:
+            progress.add_word(new_points)
+        progress.save()
+        return progress
+    
+    def rebuild(self, users=None, blocks=None) -> int:
+        """Recompute progress rows from UserWord. Returns the number of rows written."""
+        user_word_filters = {'word__blocks__isnull': False}
+        progress_filters = dict()
+        if users is not None:
+            user_word_filters['user__in'] = progress_filters['user__in'] = users
+        if blocks is not None:
+            user_word_filters['word__blocks__in'] = progress_filters['block__in'] = blocks
+        # Filter in a single call so that all conditions share one join on WordInfo.blocks
+        user_words = UserWord.objects.filter(**user_word_filters)
+        progress_rows = self.filter(**progress_filters)
+
+        user_words = user_words.values('user_id', 'word__blocks').annotate(
+            points_sum=Sum('points'), **get_mastery_level_aggregates()
+        ).order_by()
+        rebuilt_progress = []
+        for row in user_words.iterator():
+            histogram = [row[f'level_{level}'] for level in range(NUM_WORD_MASTERY_LEVELS)]
+            rebuilt_progress.append(self.model(
+                user_id=row['user_id'],
+                block_id=row['word__blocks'],
+                learned_count=sum(histogram),
+                points_sum=row['points_sum'],
+                mastery_levels=histogram,
+            ))
+
+        with transaction.atomic():
+            progress_rows.delete()
+            self.bulk_create(rebuilt_progress, batch_size=1000)
+        return len(rebuilt_progress)
+
+
+class BlockProgress(models.Model):
+    """Denormalized learning progress of a user in a block, kept in sync with UserWord."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    block = models.ForeignKey(Block, on_delete=models.CASCADE)
+    learned_count = models.PositiveIntegerField(default=0)
+    points_sum = models.PositiveIntegerField(default=0)
+    mastery_levels = models.JSONField(default=get_empty_mastery_histogram)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = BlockProgressManager()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'block'], name='unique_block_progress'),
+        ]
+    
+    def __str__(self):
+        return f'{self.user} - {self.block}'
+    
+    def add_word(self, points):
+        self.learned_count += 1
+        self.points_sum += points
+        self.mastery_levels[get_word_mastery_level(points)] += 1
+    
+    def remove_word(self, points):
+        self.learned_count = max(0, self.learned_count - 1)
+        self.points_sum = max(0, self.points_sum - points)
+        level = get_word_mastery_level(points)
+        self.mastery_levels[level] = max(0, self.mastery_levels[level] - 1)
+    
+    def get_mastery_summary(self, num_block_words) -> dict:
+        return get_mastery_summary(self.mastery_levels, num_block_words)
     
-    @property
-    def mastery_level(self):
-        level = bisect_right(EXP_NEEDED_BY_WORD_MASTERY_LEVEL, self.points) - 1
-        return level
+    def get_mastery_level(self, num_block_words):
+        return self.get_mastery_summary(num_block_words)['mastery_level']
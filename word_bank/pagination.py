@@ -0,0 +1,41 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(added_at: datetime, pk: int) -> str:
+    return base64.urlsafe_b64encode(f'{added_at.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Return (added_at, pk) of the cursor, raises InvalidCursor."""
+    try:
+        added_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(added_at), int(pk)
+    except (binascii.Error, UnicodeError, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+def paginate_by_added_at(queryset, cursor=None, page_size=50) -> tuple:
+    """
+    Keyset pagination on (-added_at, -id): return (items, next_cursor), next_cursor is None on the last page.
+    Pages are read from the cursor on with an index seek instead of an OFFSET.
+    """
+    queryset = queryset.order_by('-added_at', '-id')
+    if cursor:
+        added_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(added_at__lt=added_at) | Q(added_at=added_at, id__lt=pk))
+
+    # One more row tells whether there is a next page
+    items = list(queryset[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+
+    items = items[:page_size]
+    return items, encode_cursor(items[-1].added_at, items[-1].id)
@@ -0,0 +1,69 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .catalogue import invalidate_catalogue
+from .models import Block, BlockProgress, UserWord, WordInfo
+from .utils import bump_progress_version
+
+
+@receiver(post_save, sender=UserWord)
+def update_block_progress_on_save(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        # Loaded fixtures bring their own progress rows, see rebuild_block_progress
+        return
+    old_points = getattr(instance, '_loaded_points', None)
+    if not created and old_points is None:
+        # Points before the save are unknown, recompute the affected rows
+        BlockProgress.objects.rebuild(users=[instance.user_id], blocks=instance.word.blocks.all())
+    elif created or old_points != instance.points:
+        BlockProgress.objects.record_user_word_change(
+            instance.user_id, instance.word_id,
+            old_points=None if created else old_points,
+            new_points=instance.points,
+        )
+    instance._loaded_points = instance.points
+    bump_progress_version(instance.user_id)
+
+
+@receiver(post_delete, sender=UserWord)
+def update_block_progress_on_delete(sender, instance, **kwargs):
+    BlockProgress.objects.record_user_word_change(
+        instance.user_id, instance.word_id, old_points=instance.points
+    )
+    bump_progress_version(instance.user_id)
+
+
+@receiver(pre_delete, sender=WordInfo)
+def update_block_progress_on_word_info_delete(sender, instance, **kwargs):
+    # WordInfo.blocks rows are deleted before the cascaded UserWords, so subtract them here
+    block_ids = list(instance.blocks.values_list('id', flat=True))
+    BlockProgress.objects.record_block_words_change([instance.id], block_ids, added=False)
+
+
+@receiver(m2m_changed, sender=WordInfo.blocks.through)
+def update_block_progress_on_blocks_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        related_manager = instance.wordinfo_set if reverse else instance.blocks
+        pk_set = set(related_manager.values_list('id', flat=True))
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    if not pk_set:
+        return
+
+    word_ids, block_ids = (pk_set, [instance.id]) if reverse else ([instance.id], pk_set)
+    BlockProgress.objects.record_block_words_change(word_ids, block_ids, added=action == 'post_add')
+
+
+@receiver(post_save, sender=Block)
+@receiver(post_delete, sender=Block)
+@receiver(post_save, sender=WordInfo)
+@receiver(post_delete, sender=WordInfo)
+def invalidate_catalogue_on_change(sender, **kwargs):
+    invalidate_catalogue()
+
+
+@receiver(m2m_changed, sender=WordInfo.blocks.through)
+def invalidate_catalogue_on_blocks_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_catalogue()
@@ -1,4 +1,6 @@
 from django import template
+from django.middleware.csrf import get_token
+from django.utils.html import format_html
 
 
 register = template.Library()
@@ -7,3 +9,15 @@ register = template.Library()
 def remove_language(value):
     """Removes language code from url."""
     return value.split('/', 2)[2]
+
+
+@register.simple_tag(takes_context=True)
+def csrf_input(context, placeholder=False):
+    """
+    CSRF token input, left empty on cached anonymous pages and filled in by base.js.
+    Use placeholder=True inside cached fragments.
+    """
+    request = context['request']
+    if placeholder or getattr(request, 'cache_anonymous_page', False):
+        return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="" data-csrf-placeholder>')
+    return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', get_token(request))
@@ -1,3 +1,4 @@
+from django.contrib import admin
 from django.test import RequestFactory, TestCase, tag
 
 from word_bank.admin import (AdvancedUserWordMasteryLevelListFilter,
@@ -42,7 +43,27 @@ class BlockIsBasicListFilterTest(TestCase):
 
 @tag("word_bank", "admin", "admin_word_mastery_list_filter")
 class AdvancedUserWordMasteryLevelListFilterTest(TestCase):
-    ...
+    fixtures = ['test_users.json', 'test_blocks.json', 'test_word_infos.json', 'test_user_words.json']
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.model_admin = UserWordAdmin(UserWord, admin.site)
+
+    def get_filter(self, value=None):
+        params = {'mastery_level': value} if value is not None else {}
+        return AdvancedUserWordMasteryLevelListFilter(self.request, params, UserWord, self.model_admin)
+
+    def test_lookups(self):
+        list_filter = self.get_filter()
+        with self.assertNumQueries(1):
+            lookups = list_filter.lookups(self.request, self.model_admin)
+        self.assertEqual(lookups, [('0', '0'), ('1', '1')])
+
+    def test_queryset(self):
+        queryset = self.get_filter('1').queryset(self.request, UserWord.objects.all())
+
+        self.assertTrue(queryset.exists())
+        self.assertTrue(all(user_word.points == 1 for user_word in queryset))
             
         
     
\ No newline at end of file
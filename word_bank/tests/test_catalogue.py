@@ -0,0 +1,239 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+
+from word_bank.catalogue import (CATALOGUE_VERSION_KEY, LocalCache,
+                                 bump_catalogue_version, get_block,
+                                 get_block_words, get_catalogue_cache,
+                                 get_catalogue_stats, get_catalogue_version,
+                                 get_shared, local_catalogue_cache)
+from word_bank.models import Block, WordInfo
+
+
+CATALOGUE_TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalogue': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalogue',
+    },
+}
+
+
+@tag("word_bank", "catalogue")
+@override_settings(CACHES=CATALOGUE_TEST_CACHES)
+class CatalogueTestCase(TestCase):
+    fixtures = ['test_blocks.json', 'test_word_infos.json']
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_block = Block.objects.get(slug='test-block')
+        cls.test_block_words = list(WordInfo.objects.filter(blocks=cls.test_block))
+    
+    def setUp(self):
+        get_catalogue_cache().clear()
+        local_catalogue_cache.clear()
+    
+    def test_catalogue_version_bump(self):
+        version = get_catalogue_version()
+        bump_catalogue_version()
+        
+        self.assertEqual(get_catalogue_version(), version + 1)
+    
+    def test_get_block_is_cached(self):
+        get_block('test-block')
+        with self.assertNumQueries(0):
+            block = get_block('test-block')
+
+        self.assertEqual(block, self.test_block)
+        self.assertEqual(block.name, self.test_block.name)
+    
+    def test_get_block_local_tier_skips_shared_cache(self):
+        get_block('test-block')
+        get_catalogue_cache().delete('block:test-block', version=get_catalogue_version())
+        with self.assertNumQueries(0):
+            get_block('test-block')
+
+        stats = get_catalogue_stats()
+        self.assertEqual(stats['local']['hits'], 1)
+        self.assertEqual(stats['local']['misses'], 1)
+    
+    def test_get_block_returns_copies(self):
+        block = get_block('test-block')
+        block.is_completed = True
+
+        self.assertFalse(hasattr(get_block('test-block'), 'is_completed'))
+    
+    def test_get_block_does_not_exist(self):
+        with self.assertRaises(Block.DoesNotExist):
+            get_block('missing-block')
+    
+    def test_get_block_words_is_cached(self):
+        get_block_words(self.test_block)
+        with self.assertNumQueries(0):
+            block_words = get_block_words(self.test_block)
+
+        self.assertEqual(block_words, self.test_block_words)
+    
+    def test_block_save_invalidates_block(self):
+        get_block('test-block')
+        self.test_block.name = 'Renamed block'
+        self.test_block.save()
+
+        self.assertEqual(get_block('test-block').name, 'Renamed block')
+    
+    def test_word_info_save_invalidates_block_words(self):
+        get_block_words(self.test_block)
+        word = self.test_block_words[0]
+        word.translation = 'new translation'
+        word.save()
+
+        block_words = {block_word.id: block_word for block_word in get_block_words(self.test_block)}
+        self.assertEqual(block_words[word.id].translation, 'new translation')
+    
+    def test_word_info_delete_invalidates_block_words(self):
+        get_block_words(self.test_block)
+        self.test_block_words[0].delete()
+
+        self.assertEqual(len(get_block_words(self.test_block)), len(self.test_block_words) - 1)
+    
+    def test_blocks_change_invalidates_block_words(self):
+        get_block_words(self.test_block)
+        new_word = WordInfo.objects.create(name='new word', transliteration='new word', translation='new translation')
+        self.test_block.wordinfo_set.add(new_word)
+        self.assertIn(new_word, get_block_words(self.test_block))
+        
+        self.test_block.wordinfo_set.clear()
+        self.assertEqual(get_block_words(self.test_block), [])
+    
+    def test_invalidation_is_repeated_on_commit(self):
+        version = get_catalogue_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_block.save()
+        
+        self.assertEqual(get_catalogue_version(), version + 2)
+    
+    def test_version_bumped_by_another_worker_is_seen_by_next_request(self):
+        url = reverse('block_detail', kwargs={'slug': 'test-block'})
+        self.client.get(url)
+        # Another worker saved the block: the shared version changed, the local tier is untouched
+        Block.objects.filter(pk=self.test_block.pk).update(name='Renamed block')
+        get_catalogue_cache().incr(CATALOGUE_VERSION_KEY)
+
+        response = self.client.get(url)
+        self.assertEqual(response.context['learning_block'].name, 'Renamed block')
+    
+    def test_stale_value_served_while_entry_is_rebuilt(self):
+        get_block('test-block')
+        Block.objects.filter(pk=self.test_block.pk).update(name='Renamed block')
+        bump_catalogue_version()
+        version = get_catalogue_version()
+        # Another worker holds the rebuild lock
+        get_catalogue_cache().add(f'lock:block:test-block:{version}', True)
+
+        with self.assertNumQueries(0):
+            stale_block = get_block('test-block')
+        get_catalogue_cache().delete(f'lock:block:test-block:{version}')
+        
+        self.assertEqual(stale_block.name, self.test_block.name)
+        self.assertGreaterEqual(get_catalogue_stats()['shared']['stale'], 1)
+        # The stale value was not kept by the local tier
+        self.assertEqual(get_block('test-block').name, 'Renamed block')
+    
+    def test_outdated_entry_is_rebuilt_by_lock_holder(self):
+        get_block('test-block')
+        Block.objects.filter(pk=self.test_block.pk).update(name='Renamed block')
+        bump_catalogue_version()
+
+        self.assertEqual(get_block('test-block').name, 'Renamed block')
+        self.assertIsNone(get_catalogue_cache().get(f'lock:block:test-block:{get_catalogue_version()}'))
+    
+    def test_concurrent_miss_waits_for_lock_holder(self):
+        cache = get_catalogue_cache()
+        version = get_catalogue_version()
+        cache.add(f'lock:key:{version}', True)
+        load = mock.Mock(return_value='loaded')
+
+        def store_value(seconds):
+            cache.set('key', (version, 'stored by lock holder'))
+
+        with mock.patch('word_bank.catalogue.time.sleep', side_effect=store_value):
+            value, is_fresh = get_shared('key', version, load)
+
+        self.assertEqual(value, 'stored by lock holder')
+        self.assertTrue(is_fresh)
+        load.assert_not_called()
+    
+    def test_concurrent_miss_loads_when_lock_is_released_without_value(self):
+        cache = get_catalogue_cache()
+        version = get_catalogue_version()
+        cache.add(f'lock:key:{version}', True)
+
+        def release_lock(seconds):
+            cache.delete(f'lock:key:{version}')
+
+        with mock.patch('word_bank.catalogue.time.sleep', side_effect=release_lock):
+            value, is_fresh = get_shared('key', version, lambda: 'loaded')
+
+        self.assertEqual(value, 'loaded')
+    
+    def test_uncacheable_value_is_not_stored(self):
+        version = get_catalogue_version()
+        get_shared('key', version, lambda: 'loaded', is_cacheable=lambda value: False)
+
+        self.assertIsNone(get_catalogue_cache().get('key'))
+    
+    def test_user_block_words_view_uses_catalogue(self):
+        url = reverse('user_block_words', kwargs={'slug': 'test-block'})
+        self.client.get(url)
+        
+        # Anonymous users need no queries at all once the catalogue is cached
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['learning_block'], self.test_block)
+    
+    def test_quiz_multiple_choice_view_uses_catalogue(self):
+        url = reverse('quiz_multiple_choice')
+        self.client.post(url, {'learning_block': 'test-block'})
+        
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {'learning_block': 'test-block'})
+
+        self.assertEqual(len(response.context['questions']), len(self.test_block_words))
+
+
+@tag("word_bank", "catalogue")
+class LocalCacheTestCase(TestCase):
+    def test_local_cache_lru_eviction(self):
+        local_cache = LocalCache(max_entries=2)
+        local_cache.set('a', 1)
+        local_cache.set('b', 2)
+        local_cache.get('a')
+        local_cache.set('c', 3)
+
+        self.assertIsNone(local_cache.get('b'))
+        self.assertEqual(local_cache.get('a'), 1)
+        self.assertEqual(local_cache.evictions, 1)
+        self.assertEqual(len(local_cache), 2)
+    
+    def test_local_cache_timeout(self):
+        local_cache = LocalCache(timeout=-1)
+        local_cache.set('a', 1)
+
+        self.assertIsNone(local_cache.get('a'))
+        self.assertEqual(local_cache.evictions, 1)
+        self.assertEqual(local_cache.misses, 1)
+    
+    def test_local_cache_copies_list_items(self):
+        local_cache = LocalCache()
+        word = WordInfo(name='word')
+        local_cache.set('words', [word])
+        cached_word = local_cache.get('words')[0]
+        cached_word.options = ['option']
+
+        self.assertIsNot(cached_word, word)
+        self.assertFalse(hasattr(local_cache.get('words')[0], 'options'))
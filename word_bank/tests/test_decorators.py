@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+
+from word_bank.catalogue import (bump_catalogue_version, get_catalogue_cache,
+                                 local_catalogue_cache)
+from word_bank.models import Block
+from word_bank.tests.test_catalogue import CATALOGUE_TEST_CACHES
+
+
+@tag("word_bank", "decorators", "cache_anonymous_page")
+@override_settings(CACHES=CATALOGUE_TEST_CACHES)
+class CacheAnonymousPageTestCase(TestCase):
+    fixtures = ['test_users.json', 'test_blocks.json', 'test_word_infos.json']
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = get_user_model().objects.first()
+        cls.url = reverse('block_detail', kwargs={'slug': 'test-block'})
+    
+    def setUp(self):
+        get_catalogue_cache().clear()
+        local_catalogue_cache.clear()
+    
+    def test_anonymous_page_is_cached(self):
+        first_response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second_response = self.client.get(self.url)
+
+        self.assertIsNotNone(first_response.context)
+        self.assertIsNone(second_response.context)
+        self.assertEqual(first_response.content, second_response.content)
+    
+    def test_anonymous_page_ignores_query_string(self):
+        first_response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second_response = self.client.get(self.url, {'x': 1})
+
+        self.assertIsNone(second_response.context)
+        self.assertEqual(first_response.content, second_response.content)
+    
+    def test_anonymous_page_headers(self):
+        response = self.client.get(self.url)
+
+        self.assertIn('Cookie', response['Vary'])
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+    
+    def test_anonymous_page_has_no_csrf_token(self):
+        response = self.client.get(self.url)
+
+        self.assertNotIn('csrftoken', response.cookies)
+        self.assertContains(response, 'data-csrf-placeholder', count=3)
+        self.assertContains(response, 'name="csrfmiddlewaretoken" value=""', count=3)
+    
+    def test_anonymous_page_per_language(self):
+        english_response = self.client.get(self.url)
+        russian_response = self.client.get(self.url.replace('/en/', '/ru/', 1))
+
+        self.assertIsNotNone(russian_response.context)
+        self.assertNotEqual(english_response.content, russian_response.content)
+    
+    def test_anonymous_page_invalidated_by_catalogue_version(self):
+        self.client.get(self.url)
+        Block.objects.filter(slug='test-block').update(name='Renamed block')
+        bump_catalogue_version()
+
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Renamed block')
+    
+    def test_authenticated_user_bypasses_cache(self):
+        self.client.get(self.url)
+        self.client.force_login(self.test_user)
+        response = self.client.get(self.url)
+
+        self.assertIsNotNone(response.context)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertNotContains(response, 'data-csrf-placeholder')
+    
+    def test_anonymous_page_not_cached_when_not_found(self):
+        url = reverse('block_detail', kwargs={'slug': 'missing-block'})
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import RequestFactory, TestCase, override_settings, tag
+from django.urls import reverse
+
+from word_bank.catalogue import (bump_catalogue_version, get_block,
+                                 get_cached, get_catalogue_cache,
+                                 local_catalogue_cache)
+from word_bank.identity_map import get_identity_mapped, request_identity_map
+from word_bank.middleware import IdentityMapMiddleware
+from word_bank.tests.test_catalogue import CATALOGUE_TEST_CACHES
+
+
+@tag("word_bank", "identity_map")
+class IdentityMapTestCase(TestCase):
+    def setUp(self):
+        self.token = request_identity_map.set(dict())
+
+    def tearDown(self):
+        request_identity_map.reset(self.token)
+
+    def test_identity_mapped_loaded_once(self):
+        load = mock.Mock(side_effect=lambda: object())
+        value = get_identity_mapped('key', load)
+
+        self.assertIs(get_identity_mapped('key', load), value)
+        load.assert_called_once()
+
+    def test_identity_mapped_outside_of_request(self):
+        request_identity_map.set(None)
+        load = mock.Mock(side_effect=lambda: object())
+
+        self.assertIsNot(get_identity_mapped('key', load), get_identity_mapped('key', load))
+        self.assertEqual(load.call_count, 2)
+
+    def test_identity_map_per_thread_context(self):
+        # Each request gets its own map, threads without one do not see this request's objects
+        get_identity_mapped('key', lambda: 'request value')
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            value = executor.submit(get_identity_mapped, 'key', lambda: 'thread value').result()
+
+        self.assertEqual(value, 'thread value')
+        self.assertEqual(get_identity_mapped('key', lambda: 'other value'), 'request value')
+
+
+@tag("word_bank", "identity_map", "middleware")
+@override_settings(CACHES=CATALOGUE_TEST_CACHES)
+class IdentityMapMiddlewareTestCase(TestCase):
+    fixtures = ['test_blocks.json']
+
+    def setUp(self):
+        get_catalogue_cache().clear()
+        local_catalogue_cache.clear()
+
+    def get_blocks(self, request):
+        return [get_block('test-block'), get_block('test-block')]
+
+    def test_middleware_returns_same_block_within_request(self):
+        middleware = IdentityMapMiddleware(self.get_blocks)
+        first_blocks = middleware(RequestFactory().get('/'))
+        second_blocks = middleware(RequestFactory().get('/'))
+
+        self.assertIs(first_blocks[0], first_blocks[1])
+        self.assertIsNot(first_blocks[0], second_blocks[0])
+        self.assertIsNone(request_identity_map.get())
+
+    def test_middleware_drops_block_after_catalogue_change(self):
+        def get_blocks(request):
+            block = get_block('test-block')
+            bump_catalogue_version()
+            return [block, get_block('test-block')]
+
+        blocks = IdentityMapMiddleware(get_blocks)(RequestFactory().get('/'))
+        self.assertIsNot(blocks[0], blocks[1])
+
+    def test_user_block_words_view_loads_block_once(self):
+        with mock.patch('word_bank.catalogue.get_cached', wraps=get_cached) as catalogue_get_cached:
+            response = self.client.get(reverse('user_block_words', kwargs={'slug': 'test-block'}))
+
+        self.assertEqual(response.status_code, 200)
+        catalogue_get_cached.assert_called_once()
@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.db import IntegrityError
+from django.db.models import F
 from django.test import TestCase, tag
+from django.utils import timezone
 
-from word_bank.models import Block, WordInfo
+from word_bank.models import (Block, BlockDistractors, BlockProgress, UserWord,
+                              WordInfo)
 
 
 @tag("word_bank", "model", "model_block")
@@ -29,6 +33,10 @@ class BlockModelTestCase(TestCase):
         
     def test_block_str(self):
         self.assertEqual(str(self.test_block_default_slug), 'Test Block Default Slug')
+
+    def test_block_projections(self):
+        self.assertEqual(Block.objects.for_card().first().get_deferred_fields(), {'theory', 'added_at', 'updated_at', 'is_visible'})
+        self.assertEqual(Block.objects.for_table().first().get_deferred_fields(), {'theory'})
     
     def test_block_get_absolute_url(self):
         self.assertEqual(self.test_block.get_absolute_url(), '/en/learn/test-block/')
@@ -71,6 +79,24 @@ class BlockModelTestCase(TestCase):
         test_user_block_fully_learned = self.test_block.is_fully_learned(AnonymousUser())
         self.assertFalse(test_user_block_fully_learned)
 
+    def test_block_with_progress_user_has_words(self):
+        block = Block.objects.with_progress(self.test_user_has_words).get(pk=self.test_block.pk)
+
+        self.assertEqual(block.word_count, 5)
+        self.assertEqual(block.learned_count, 1)
+        self.assertFalse(block.is_completed)
+    
+    def test_block_with_progress_user_anonymous(self):
+        block = Block.objects.with_progress(AnonymousUser()).get(pk=self.test_block.pk)
+
+        self.assertEqual(block.word_count, 5)
+        self.assertEqual(block.learned_count, 0)
+        self.assertFalse(block.is_completed)
+    
+    def test_block_visible_to(self):
+        self.assertNotIn(self.test_block, Block.objects.visible_to(AnonymousUser()))
+        self.assertIn(self.test_block, Block.objects.visible_to(self.User.objects.get(username='test_user_staff')))
+
 
 @tag("word_bank", "model", "model_word_info")
 class WordInfoModelTestCase(TestCase):
@@ -101,20 +127,35 @@ class WordInfoModelTestCase(TestCase):
 
     def test_word_info_example_short_with_no_example(self):
         self.assertIsNone(self.test_word_info_no_example.example_short())
+
+
+@tag("word_bank", "model", "model_block_distractors")
+class BlockDistractorsTestCase(TestCase):
+    fixtures = ['test_blocks.json', 'test_word_infos.json']
     
-    def test_word_info_generate_three_options(self):
-        self.test_word_info.generate_options(self.test_block)
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_block = Block.objects.first()
+        cls.test_word_infos = list(WordInfo.objects.filter(blocks=cls.test_block))
+        cls.distractors = BlockDistractors(cls.test_word_infos)
 
-        self.assertIsInstance(self.test_word_info.options, list)
-        self.assertEqual(len(self.test_word_info.options), 4)
-        for option in self.test_word_info.options:
-            self.assertIn(option, WordInfo.objects.values_list('translation', flat=True))
+    def test_block_distractors_translations(self):
+        self.assertEqual(self.distractors.translations, [word.translation for word in self.test_word_infos])
     
-    def test_word_info_generate_options_too_many_n_wrong(self):
-        self.test_word_info.generate_options(self.test_block, n_wrong=100)
-        
-        self.assertIsInstance(self.test_word_info.options, list)
-        self.assertEqual(len(self.test_word_info.options), WordInfo.objects.count())
+    def test_block_distractors_sample_excludes_word(self):
+        for word in self.test_word_infos:
+            wrong_options = self.distractors.sample(word.id, n_wrong=len(self.test_word_infos))
+            
+            self.assertEqual(len(wrong_options), len(self.test_word_infos) - 1)
+            self.assertEqual(len(set(wrong_options)), len(wrong_options))
+            self.assertNotIn(word.translation, wrong_options)
+    
+    def test_block_distractors_sample_word_outside_block(self):
+        wrong_options = self.distractors.sample(word_id=0, n_wrong=3)
+        self.assertEqual(len(wrong_options), 3)
+    
+    def test_block_distractors_sample_empty_block(self):
+        self.assertEqual(BlockDistractors([]).sample(word_id=1), [])
 
 
 @tag("word_bank", "model", "model_user_word")
@@ -138,4 +179,266 @@ class UserWordModelTestCase(TestCase):
 
     def test_user_word_mastery_level_is_zero(self):
         self.assertEqual(self.test_user_word2.mastery_level, 0)
-    
\ No newline at end of file
+
+    def test_user_word_get_mastery_summary(self):
+        block_user_words = UserWord.objects.filter(user=self.test_user, word__blocks__slug='test-block')
+        mastery_summary = block_user_words.get_mastery_summary(num_block_words=5)
+
+        self.assertEqual(mastery_summary['histogram'], [1, 1, 0, 0, 0, 0, 0])
+        self.assertEqual(mastery_summary['learned_count'], 2)
+        self.assertEqual(mastery_summary['mastery_level'], 0.2)
+    
+    def test_user_word_get_mastery_summary_buckets_match_mastery_level(self):
+        points = [0, 1, 4, 5, 14, 15, 35, 69, 70, 99, 100]
+        new_words = WordInfo.objects.bulk_create([
+            WordInfo(name=f'word {i}', transliteration=f'word {i}', translation=f'translation {i}') for i in range(len(points))
+        ])
+        UserWord.objects.bulk_create([
+            UserWord(user=self.test_user, word=word, points=points_value) for word, points_value in zip(new_words, points)
+        ])
+        user_words = UserWord.objects.filter(user=self.test_user, word__in=new_words)
+        histogram = user_words.get_mastery_summary()['histogram']
+
+        self.assertEqual(histogram, [1, 2, 2, 1, 2, 2, 1])
+        self.assertEqual(histogram, [sum(1 for user_word in user_words if user_word.mastery_level == level) for level in range(7)])
+    
+    def test_user_word_unique_per_user(self):
+        with self.assertRaises(IntegrityError):
+            UserWord.objects.create(user=self.test_user, word=self.test_user_word.word)
+    
+    def test_user_word_upsert_creates(self):
+        test_word_info = WordInfo.objects.get(pk=3)
+        user_word, created = UserWord.objects.upsert(self.test_user, test_word_info, points=2)
+
+        self.assertTrue(created)
+        self.assertEqual(user_word.points, 2)
+        self.assertEqual(UserWord.objects.get(user=self.test_user, word=test_word_info).pk, user_word.pk)
+        progress = BlockProgress.objects.get(user=self.test_user, block__slug='test-block')
+        self.assertEqual(progress.learned_count, 3)
+        self.assertEqual(progress.points_sum, 3)
+    
+    def test_user_word_upsert_existing(self):
+        num_user_words = UserWord.objects.count()
+        user_word, created = UserWord.objects.upsert(self.test_user, self.test_user_word.word, points=5)
+
+        self.assertFalse(created)
+        self.assertEqual(user_word.pk, self.test_user_word.pk)
+        self.assertEqual(user_word.points, self.test_user_word.points)
+        self.assertEqual(user_word.added_at, self.test_user_word.added_at)
+        self.assertEqual(UserWord.objects.count(), num_user_words)
+        progress = BlockProgress.objects.get(user=self.test_user, block__slug='test-block')
+        self.assertEqual(progress.learned_count, 2)
+    
+    def test_user_word_upsert_existing_touches_updated_at(self):
+        test_word_info = self.test_user_word.word
+        with self.assertNumQueries(2):
+            user_word, created = UserWord.objects.upsert(self.test_user, test_word_info)
+
+        self.assertFalse(created)
+        self.assertGreater(user_word.updated_at, self.test_user_word.updated_at)
+        self.assertEqual(UserWord.objects.get(pk=user_word.pk).updated_at, user_word.updated_at)
+    
+    def test_user_word_merge_duplicates_without_duplicates(self):
+        self.assertEqual(UserWord.objects.merge_duplicates(), 0)
+
+    def get_stored_mastery_level(self, user_word):
+        return UserWord.objects.values_list('mastery_level', flat=True).get(pk=user_word.pk)
+
+    def test_user_word_mastery_level_synced_on_save(self):
+        self.test_user_word.points = 15
+        self.test_user_word.save(update_fields=['points'])
+        self.assertEqual(self.get_stored_mastery_level(self.test_user_word), 3)
+
+    def test_user_word_mastery_level_synced_on_update(self):
+        UserWord.objects.filter(pk=self.test_user_word.pk).update(points=F('points') + 4)
+        self.assertEqual(self.get_stored_mastery_level(self.test_user_word), 2)
+
+        UserWord.objects.filter(pk=self.test_user_word.pk).update(points=70)
+        self.assertEqual(self.get_stored_mastery_level(self.test_user_word), 5)
+
+    def test_user_word_mastery_level_synced_on_add_points(self):
+        UserWord.objects.add_points({self.test_user_word.id: 4})
+
+        self.assertEqual(self.get_stored_mastery_level(self.test_user_word), 2)
+
+    def test_user_word_mastery_level_synced_on_bulk_update(self):
+        self.test_user_word.points = 35
+        UserWord.objects.bulk_update([self.test_user_word], ['points'])
+        self.assertEqual(self.get_stored_mastery_level(self.test_user_word), 4)
+
+    def test_user_word_backfill_mastery_levels(self):
+        UserWord.objects.filter(user=self.test_user).update(mastery_level=6)
+        num_updated = UserWord.objects.backfill_mastery_levels(chunk_size=1)
+
+        self.assertEqual(num_updated, 2)
+        self.assertEqual(self.get_stored_mastery_level(self.test_user_word), 1)
+        self.assertEqual(self.get_stored_mastery_level(self.test_user_word2), 0)
+        self.assertEqual(UserWord.objects.backfill_mastery_levels(), 0)
+    
+
+@tag("word_bank", "model", "model_user_word_add_points")
+class UserWordAddPointsTestCase(TestCase):
+    fixtures = [
+        'test_users.json', 'test_blocks.json',
+        'test_word_infos.json', 'test_user_words.json'
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = get_user_model().objects.first()
+        cls.test_block = Block.objects.get(slug='test-block')
+        cls.test_user_word, cls.test_user_word2 = UserWord.objects.filter(user=cls.test_user).order_by('word_id')
+
+    def get_points(self, user_word) -> int:
+        return UserWord.objects.values_list('points', flat=True).get(pk=user_word.pk)
+
+    def test_user_word_add_points(self):
+        new_points = UserWord.objects.add_points({self.test_user_word.id: 10, self.test_user_word2.id: 3})
+
+        self.assertEqual(new_points, {self.test_user_word.id: 11, self.test_user_word2.id: 3})
+        self.assertEqual(self.get_points(self.test_user_word), 11)
+        self.assertEqual(self.get_points(self.test_user_word2), 3)
+
+    def test_user_word_add_points_is_clamped(self):
+        UserWord.objects.add_points({self.test_user_word.id: 200, self.test_user_word2.id: -5})
+
+        self.assertEqual(self.get_points(self.test_user_word), 100)
+        self.assertEqual(self.get_points(self.test_user_word2), 0)
+
+    def test_user_word_add_points_does_not_lose_updates(self):
+        # Changes are applied to the stored points, not to values read earlier
+        UserWord.objects.add_points({self.test_user_word.id: 2})
+        UserWord.objects.add_points({self.test_user_word.id: 2})
+
+        self.assertEqual(self.get_points(self.test_user_word), 5)
+
+    def test_user_word_add_points_num_queries(self):
+        with self.assertNumQueries(9):
+            UserWord.objects.add_points({self.test_user_word.id: 1, self.test_user_word2.id: 1})
+
+    def test_user_word_add_points_skips_words_outside_queryset(self):
+        other_user = get_user_model().objects.get(username='test_user_no_words')
+        new_points = UserWord.objects.filter(user=other_user).add_points({self.test_user_word.id: 10})
+
+        self.assertEqual(new_points, {})
+        self.assertEqual(self.get_points(self.test_user_word), 1)
+
+    def test_user_word_add_points_updates_block_progress(self):
+        UserWord.objects.add_points({self.test_user_word.id: 69, self.test_user_word2.id: 70})
+        progress = BlockProgress.objects.get(user=self.test_user, block=self.test_block)
+
+        self.assertEqual(progress.points_sum, 140)
+        self.assertEqual(progress.mastery_levels, [0, 0, 0, 0, 0, 2, 0])
+
+    def test_user_word_add_points_updates_block_progress_in_place(self):
+        progress = BlockProgress.objects.get(user=self.test_user, block=self.test_block)
+        UserWord.objects.add_points({self.test_user_word.id: 4})
+        updated_progress = BlockProgress.objects.get(user=self.test_user, block=self.test_block)
+
+        self.assertEqual(updated_progress.pk, progress.pk)
+        self.assertEqual(updated_progress.learned_count, 2)
+        self.assertEqual(updated_progress.points_sum, 5)
+        self.assertEqual(updated_progress.mastery_levels, [1, 0, 1, 0, 0, 0, 0])
+
+    def test_user_word_add_points_counts_created_user_words(self):
+        [user_word] = UserWord.objects.bulk_create([UserWord(user=self.test_user, word=WordInfo.objects.get(pk=3))])
+        UserWord.objects.add_points({user_word.id: 0, self.test_user_word.id: 1}, created_ids={user_word.id})
+        progress = BlockProgress.objects.get(user=self.test_user, block=self.test_block)
+
+        self.assertEqual(progress.learned_count, 3)
+        self.assertEqual(progress.points_sum, 2)
+        self.assertEqual(progress.mastery_levels, [2, 1, 0, 0, 0, 0, 0])
+
+
+@tag("word_bank", "model", "model_block_progress")
+class BlockProgressModelTestCase(TestCase):
+    fixtures = [
+        'test_users.json', 'test_blocks.json',
+        'test_word_infos.json', 'test_user_words.json'
+    ]
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.test_block = Block.objects.get(slug='test-block')
+        cls.test_block_2 = Block.objects.get(slug='test-block-2')
+        cls.test_user = cls.User.objects.get(username='test_user')
+        cls.test_user_no_words = cls.User.objects.get(username='test_user_no_words')
+        cls.test_word_info = WordInfo.objects.first()
+
+    def get_progress(self, user, block):
+        return BlockProgress.objects.get(user=user, block=block)
+
+    def test_block_progress_is_populated_from_user_words(self):
+        progress = self.get_progress(self.test_user, self.test_block)
+        
+        self.assertEqual(progress.learned_count, 2)
+        self.assertEqual(progress.points_sum, 1)
+        self.assertEqual(progress.mastery_levels, [1, 1, 0, 0, 0, 0, 0])
+    
+    def test_block_progress_skips_fixture_rows(self):
+        now = timezone.now()
+        user_word = UserWord(
+            user=self.test_user_no_words, word=self.test_word_info, points=5, added_at=now, updated_at=now
+        )
+        user_word.save_base(raw=True)
+
+        self.assertFalse(BlockProgress.objects.filter(user=self.test_user_no_words).exists())
+    
+    def test_block_progress_user_word_created(self):
+        UserWord.objects.create(user=self.test_user_no_words, word=self.test_word_info, points=5)
+        progress = self.get_progress(self.test_user_no_words, self.test_block)
+        
+        self.assertEqual(progress.learned_count, 1)
+        self.assertEqual(progress.points_sum, 5)
+        self.assertEqual(progress.mastery_levels, [0, 0, 1, 0, 0, 0, 0])
+    
+    def test_block_progress_user_word_points_changed(self):
+        user_word = UserWord.objects.get(user=self.test_user, word=self.test_word_info)
+        user_word.points = 20
+        user_word.save()
+        progress = self.get_progress(self.test_user, self.test_block)
+        
+        self.assertEqual(progress.learned_count, 2)
+        self.assertEqual(progress.points_sum, 20)
+        self.assertEqual(progress.mastery_levels, [1, 0, 0, 1, 0, 0, 0])
+    
+    def test_block_progress_user_word_deleted(self):
+        UserWord.objects.filter(user=self.test_user, word=self.test_word_info).delete()
+        progress = self.get_progress(self.test_user, self.test_block)
+        
+        self.assertEqual(progress.learned_count, 1)
+        self.assertEqual(progress.points_sum, 0)
+        self.assertEqual(progress.mastery_levels, [1, 0, 0, 0, 0, 0, 0])
+    
+    def test_block_progress_word_added_to_and_removed_from_block(self):
+        self.test_word_info.blocks.add(self.test_block_2)
+        progress = self.get_progress(self.test_user, self.test_block_2)
+        self.assertEqual(progress.learned_count, 1)
+        
+        self.test_block_2.wordinfo_set.clear()
+        progress.refresh_from_db()
+        self.assertEqual(progress.learned_count, 0)
+        self.assertEqual(progress.mastery_levels, [0, 0, 0, 0, 0, 0, 0])
+    
+    def test_block_progress_word_info_deleted(self):
+        self.test_word_info.delete()
+        progress = self.get_progress(self.test_user, self.test_block)
+        
+        self.assertEqual(progress.learned_count, 1)
+        self.assertEqual(progress.points_sum, 0)
+    
+    def test_block_progress_rebuild(self):
+        BlockProgress.objects.update(learned_count=0, points_sum=0)
+        num_rows = BlockProgress.objects.rebuild()
+        progress = self.get_progress(self.test_user, self.test_block)
+        
+        self.assertEqual(num_rows, BlockProgress.objects.count())
+        self.assertEqual(progress.learned_count, 2)
+        self.assertEqual(progress.points_sum, 1)
+    
+    def test_block_progress_get_mastery_level(self):
+        progress = self.get_progress(self.test_user, self.test_block)
+        
+        self.assertEqual(progress.get_mastery_level(5), 0.2)
+        self.assertEqual(progress.get_mastery_level(0), 0)
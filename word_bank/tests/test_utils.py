@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.test import SimpleTestCase, TestCase, tag
+
+from word_bank.models import UserWord, WordInfo
+from word_bank.utils import *
+
+
+@tag("word_bank", "utils", "utils_get_word_mastery_level")
+class GetWordMasteryLevelTestCase(SimpleTestCase):
+    def test_get_word_mastery_level_thresholds(self):
+        for level, min_points in enumerate(EXP_NEEDED_BY_WORD_MASTERY_LEVEL):
+            self.assertEqual(get_word_mastery_level(min_points), level)
+    
+    def test_get_word_mastery_level_below_threshold(self):
+        self.assertEqual(get_word_mastery_level(4), 1)
+        self.assertEqual(get_word_mastery_level(99), 5)
+
+
+@tag("word_bank", "utils", "utils_get_mastery_summary")
+class GetMasterySummaryTestCase(SimpleTestCase):
+    def test_get_mastery_summary_empty(self):
+        mastery_summary = get_mastery_summary()
+
+        self.assertEqual(mastery_summary['histogram'], [0] * NUM_WORD_MASTERY_LEVELS)
+        self.assertEqual(mastery_summary['learned_count'], 0)
+        self.assertEqual(mastery_summary['mastery_level'], 0)
+    
+    def test_get_mastery_summary_weighted_by_block_words(self):
+        mastery_summary = get_mastery_summary([1, 2, 0, 1, 0, 0, 0], num_block_words=8)
+
+        self.assertEqual(mastery_summary['learned_count'], 4)
+        self.assertEqual(mastery_summary['mastery_level'], 5 / 8)
+
+
+@tag("word_bank", "utils", "utils_get_ml_chart_data")
+class GetMlChartDataTestCase(SimpleTestCase):
+    def test_get_ml_chart_data_empty(self):
+        self.assertEqual(get_ml_chart_data(), {
+            'x': [0, 1, 2, 3, 4, 5, 6],
+            'y': [0, 0, 0, 0, 0, 0, 0],
+        })
+    
+    def test_get_ml_chart_data_histogram(self):
+        self.assertEqual(get_ml_chart_data([3, 1, 0, 0, 0, 0, 2]), {
+            'x': [0, 1, 2, 3, 4, 5, 6],
+            'y': [3, 1, 0, 0, 0, 0, 2],
+        })
+
+
+@tag("word_bank", "utils", "utils_progress_version")
+class ProgressVersionTestCase(TestCase):
+    fixtures = ['test_users.json', 'test_blocks.json', 'test_word_infos.json']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = get_user_model().objects.first()
+
+    def test_progress_version_anonymous_user(self):
+        self.assertEqual(get_progress_version(AnonymousUser()), 0)
+
+    def test_progress_version_is_stable(self):
+        self.assertEqual(get_progress_version(self.test_user), get_progress_version(self.test_user))
+
+    def test_bump_progress_version(self):
+        progress_version = get_progress_version(self.test_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_progress_version(self.test_user.id)
+        self.assertEqual(get_progress_version(self.test_user), progress_version + 2)
+
+    def test_progress_version_bumped_by_user_word_writes(self):
+        progress_version = get_progress_version(self.test_user)
+        user_word = UserWord.objects.create(user=self.test_user, word=WordInfo.objects.first())
+        self.assertGreater(get_progress_version(self.test_user), progress_version)
+
+        progress_version = get_progress_version(self.test_user)
+        UserWord.objects.add_points({user_word.id: 1})
+        self.assertGreater(get_progress_version(self.test_user), progress_version)
+
+        progress_version = get_progress_version(self.test_user)
+        user_word.delete()
+        self.assertGreater(get_progress_version(self.test_user), progress_version)
+
+    def test_progress_version_bumped_by_queryset_writes(self):
+        progress_version = get_progress_version(self.test_user)
+        [user_word] = UserWord.objects.bulk_create([UserWord(user=self.test_user, word=WordInfo.objects.first())])
+        self.assertGreater(get_progress_version(self.test_user), progress_version)
+
+        progress_version = get_progress_version(self.test_user)
+        UserWord.objects.filter(pk=user_word.pk).update(points=5)
+        self.assertGreater(get_progress_version(self.test_user), progress_version)
+
+        progress_version = get_progress_version(self.test_user)
+        user_word.points = 15
+        UserWord.objects.bulk_update([user_word], ['points'])
+        self.assertGreater(get_progress_version(self.test_user), progress_version)
+
+    def test_progress_version_not_bumped_by_touching_updated_at(self):
+        user_word = UserWord.objects.create(user=self.test_user, word=WordInfo.objects.first())
+        progress_version = get_progress_version(self.test_user)
+        UserWord.objects.filter(pk=user_word.pk).update(updated_at=user_word.updated_at)
+        self.assertEqual(get_progress_version(self.test_user), progress_version)
@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.db.models.query import QuerySet
-from django.test import TestCase, tag
+from django.test import TestCase, override_settings, tag
 from django.urls import reverse
 
+from word_bank.catalogue import get_catalogue_cache, local_catalogue_cache
 from word_bank.models import Block, UserWord, WordInfo
+from word_bank.tests.test_catalogue import CATALOGUE_TEST_CACHES
 
 
 @tag("word_bank", "view", "view_learn_list")
@@ -21,8 +23,13 @@ class LearnListViewTestCase(TestCase):
         cls.template_name = 'word_bank/learn.html'
         
         cls.test_block = Block.objects.first()
+        cls.test_block.is_visible = True
+        cls.test_block.save()
+        cls.test_hidden_block = Block.objects.get(slug='test-block-2')
         cls.test_user = cls.User.objects.first()
         cls.test_user_profile = cls.test_user.profile
+        cls.test_user_staff = cls.User.objects.get(username='test_user_staff')
+        cls.test_user_all_words_learned = cls.User.objects.get(username='test_user_all_words_learned')
 
     def test_learn_list_view_as_anonymous_user(self):
         response = self.client.get(self.url)
@@ -45,7 +52,100 @@ class LearnListViewTestCase(TestCase):
         self.assertEqual(self.test_user_profile.experience, 20)
         self.assertEqual(self.test_user_profile.level, 2)
         self.assertIn(self.test_block, response.context['learning_blocks'])
-        
+    
+    def test_learn_list_view_hidden_blocks_are_excluded(self):
+        response = self.client.get(self.url)
+        self.assertNotIn(self.test_hidden_block, response.context['learning_blocks'])
+    
+    def test_learn_list_view_hidden_blocks_are_shown_to_staff(self):
+        self.client.force_login(self.test_user_staff)
+        response = self.client.get(self.url)
+        self.assertIn(self.test_hidden_block, response.context['learning_blocks'])
+    
+    def test_learn_list_view_block_is_completed(self):
+        self.client.force_login(self.test_user_all_words_learned)
+        response = self.client.get(self.url)
+        learning_block = response.context['learning_blocks'].get(pk=self.test_block.pk)
+
+        self.assertEqual(learning_block.word_count, 5)
+        self.assertEqual(learning_block.learned_count, 5)
+        self.assertTrue(learning_block.is_completed)
+    
+    def test_learn_list_view_num_queries_do_not_depend_on_num_blocks(self):
+        self.client.force_login(self.test_user)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        Block.objects.bulk_create([Block(name=f'Block {i}', slug=f'block-{i}', is_visible=True) for i in range(10)])
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+
+@tag("word_bank", "view", "view_learn_list", "view_learn_list_fragments")
+@override_settings(CACHES=CATALOGUE_TEST_CACHES)
+class LearnListViewFragmentCacheTestCase(TestCase):
+    fixtures = [
+        'test_users.json', 'test_profiles.json',
+        'test_blocks.json', 'test_word_infos.json',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.url = reverse('learn')
+
+        cls.test_block = Block.objects.get(slug='test-block')
+        cls.test_block.is_visible = True
+        cls.test_block.save()
+        cls.test_user = cls.User.objects.get(username='test_user_no_words')
+        cls.test_user_other = cls.User.objects.get(username='test_user_has_words')
+
+    def setUp(self):
+        get_catalogue_cache().clear()
+        local_catalogue_cache.clear()
+
+    def get_block_card(self, response) -> str:
+        content = response.content.decode('utf-8')
+        return content[content.index(reverse('block_detail', kwargs={'slug': self.test_block.slug})):]
+
+    def test_block_card_is_cached(self):
+        self.client.force_login(self.test_user)
+        self.client.get(self.url)
+        self.test_block.description = 'Changed without invalidating the catalogue'
+        Block.objects.filter(pk=self.test_block.pk).update(description=self.test_block.description)
+
+        response = self.client.get(self.url)
+        self.assertNotContains(response, self.test_block.description)
+
+    def test_block_card_has_no_csrf_token(self):
+        self.client.force_login(self.test_user)
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'value="" data-csrf-placeholder')
+        self.assertNotIn('CSRF_COOKIE', response.wsgi_request.META)
+
+    def test_block_card_invalidated_by_user_word_write(self):
+        self.client.force_login(self.test_user)
+        response = self.client.get(self.url)
+        self.assertIn(reverse('quiz_learn'), self.get_block_card(response))
+
+        for word in WordInfo.objects.filter(blocks=self.test_block):
+            UserWord.objects.create(user=self.test_user, word=word, points=1)
+
+        response = self.client.get(self.url)
+        self.assertIn(reverse('quiz_shell', args=['review']), self.get_block_card(response))
+
+    def test_block_card_is_per_user(self):
+        for word in WordInfo.objects.filter(blocks=self.test_block):
+            UserWord.objects.create(user=self.test_user_other, word=word, points=1)
+
+        self.client.force_login(self.test_user_other)
+        self.client.get(self.url)
+        self.client.force_login(self.test_user)
+        response = self.client.get(self.url)
+
+        self.assertIn(reverse('quiz_learn'), self.get_block_card(response))
+
 
 @tag("word_bank", "view", "view_block_detail")
 class BlockDetailViewTestCase(TestCase):
@@ -286,8 +386,57 @@ class UserWordsListViewTestCase(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
-        self.assertIsInstance(response_words, QuerySet)
+        self.assertIsInstance(response_words, list)
         self.assertIn(self.test_user_word, response_words)
+        self.assertIsNone(response.context['next_cursor'])
+
+    def add_user_words(self, count):
+        new_words = WordInfo.objects.bulk_create([
+            WordInfo(name=f'word {i}', transliteration=f'word {i}', translation=f'translation {i}') for i in range(count)
+        ])
+        UserWord.objects.bulk_create([UserWord(user=self.test_user, word=word) for word in new_words])
+        return UserWord.objects.filter(user=self.test_user).order_by('-added_at', '-id')
+
+    def test_user_words_list_view_keyset_pages(self):
+        user_words = list(self.add_user_words(60))
+        self.client.force_login(self.test_user)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['words'], user_words[:50])
+        next_cursor = response.context['next_cursor']
+        self.assertIsNotNone(next_cursor)
+
+        response = self.client.get(self.url, {'cursor': next_cursor})
+        self.assertEqual(response.context['words'], user_words[50:])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_user_words_list_view_JSON(self):
+        user_words = list(self.add_user_words(60))
+        self.client.force_login(self.test_user)
+
+        data = self.client.get(self.url, {'format': 'json'}).json()
+        self.assertEqual([user_word['id'] for user_word in data['user_words']], [user_word.id for user_word in user_words[:50]])
+
+        data = self.client.get(self.url, {'format': 'json', 'cursor': data['next_cursor']}).json()
+        self.assertEqual([user_word['id'] for user_word in data['user_words']], [user_word.id for user_word in user_words[50:]])
+        self.assertIsNone(data['next_cursor'])
+        self.assertEqual(set(data['user_words'][0]), {
+            'id', 'name', 'audio', 'points', 'mastery_level', 'transliteration', 'translation', 'example',
+        })
+
+    def test_user_words_list_view_invalid_cursor(self):
+        self.client.force_login(self.test_user)
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_user_words_list_view_num_queries_do_not_depend_on_num_words(self):
+        self.client.force_login(self.test_user)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        self.add_user_words(20)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
 
 
 @tag("word_bank", "view", "view_user_block_words")
@@ -320,8 +469,12 @@ class UserBlockWordsListViewTestCase(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, self.template_name)
-        self.assertIsInstance(response_words, QuerySet)
+        self.assertIsInstance(response_words, list)
         self.assertEqual(len(response_words), self.test_user_word_count)
+
+    def test_user_block_words_view_block_not_found(self):
+        response = self.client.get(reverse('user_block_words', args=['not-a-block']))
+        self.assertEqual(response.status_code, 404)
         
     def test_user_block_words_view_method_not_allowed_POST(self):
         response = self.client.post(self.url)
@@ -1,11 +1,54 @@
-from collections import Counter
+from bisect import bisect_right
+
+from geogem.cache import bump_version, get_version
 
 
 EXP_NEEDED_BY_WORD_MASTERY_LEVEL = [0, 1, 5, 15, 35, 70, 100]
+NUM_WORD_MASTERY_LEVELS = len(EXP_NEEDED_BY_WORD_MASTERY_LEVEL)
+MAX_WORD_POINTS = EXP_NEEDED_BY_WORD_MASTERY_LEVEL[-1]
+PROGRESS_VERSION_KEY = 'progress_version:{user_id}'
+
+def get_word_mastery_level(points: int) -> int:
+    return bisect_right(EXP_NEEDED_BY_WORD_MASTERY_LEVEL, points) - 1
+
+
+def get_empty_mastery_histogram() -> list:
+    return [0] * NUM_WORD_MASTERY_LEVELS
+
+
+def get_mastery_summary(histogram=None, num_block_words=0) -> dict:
+    """
+    Summarize a mastery level histogram of block words.
+    mastery_level is the average mastery level over all block words (not learned ones).
+    """
+    histogram = list(histogram) if histogram else get_empty_mastery_histogram()
+    learned_count = sum(histogram)
+    if learned_count and num_block_words:
+        mastery_level = sum(level * level_count for level, level_count in enumerate(histogram)) / num_block_words
+    else:
+        mastery_level = 0
+
+    return {
+        'histogram': histogram,
+        'learned_count': learned_count,
+        'mastery_level': mastery_level,
+    }
+
+
+def get_ml_chart_data(mastery_histogram=None):
+    y = list(mastery_histogram) if mastery_histogram else get_empty_mastery_histogram()
+    return {'x': list(range(NUM_WORD_MASTERY_LEVELS)), 'y': y}
+
+
+def get_progress_version(user) -> int:
+    """
+    Version of the user's learned words, changed by every UserWord write of the user.
+    Caches of per-user pages and fragments include it in their keys. 0 for anonymous users.
+    """
+    if not user.is_authenticated:
+        return 0
+    return get_version(PROGRESS_VERSION_KEY.format(user_id=user.id))
+
 
-def get_ml_chart_data(mastery_levels=None):
-    mastery_levels_dct = Counter(mastery_levels)
-    mastery_levels_dct.update({level: 0 for level in range(len(EXP_NEEDED_BY_WORD_MASTERY_LEVEL)) if level not in EXP_NEEDED_BY_WORD_MASTERY_LEVEL})
-    x, y = zip(*sorted(mastery_levels_dct.items()))
-    return {'x': list(x), 'y': list(y)}
-    
\ No newline at end of file
+def bump_progress_version(user_id):
+    bump_version(PROGRESS_VERSION_KEY.format(user_id=user_id))
@@ -1,6 +1,6 @@
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.views.generic import DetailView, ListView, View
@@ -8,46 +8,61 @@ from django.views.generic.base import TemplateView
 
 from geogem.gui_messages import get_gui_messages
 
+from .catalogue import get_block, get_block_words, get_catalogue_version
+from .decorators import cache_anonymous_page
 from .models import Block, UserWord, WordInfo
+from .pagination import InvalidCursor, paginate_by_added_at
 from .utils import *
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class BlockListView(ListView):
     template_name = 'word_bank/learn.html'
     model = Block
     
+    def get_queryset(self):
+        user = self.request.user
+        return Block.objects.visible_to(user).with_progress(user).for_card().order_by('id')
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         blocks = context['object_list']
-        for block in blocks:
-            block.is_completed = block.is_fully_learned(user)
-        
         context['gui_messages'] = get_gui_messages(['base', 'learn_index', 'block_detail'])
         context['learning_blocks'] = blocks
         context['user_profile'] = user.profile if user.is_authenticated else None
+        # Block cards are cached as fragments until the block or the user's words change
+        context['catalogue_version'] = get_catalogue_version()
+        context['progress_version'] = get_progress_version(user)
         return context
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class BlockDetailView(DetailView):
     template_name = 'word_bank/block_detail.html'
     model = Block
+    
+    def get_object(self, queryset=None):
+        try:
+            return get_block(self.kwargs['slug'])
+        except Block.DoesNotExist:
+            raise Http404('No block found matching the query')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         gui_messages = get_gui_messages(['base', 'tooltips', 'block_detail'])
         user = self.request.user
-        learning_block = self.get_object()
-        learning_block.is_completed = learning_block.is_fully_learned(user)
-        block_words = WordInfo.objects.filter(blocks=learning_block)
+        learning_block = self.object
+        block_words = get_block_words(learning_block)
+        num_block_words = len(block_words)
+        mastery_summary = learning_block.get_mastery_summary(user, num_block_words)
         
-        block_mastery_level = learning_block.get_mastery_level(user=user)
+        block_mastery_level = mastery_summary['mastery_level']
         bml_whole_part, bml_fractional_part = divmod(block_mastery_level, 1)
     
         if user.is_authenticated:
-            num_learned_words = UserWord.objects.filter(user=user, word__blocks=learning_block).count()
-            block_user_words = UserWord.objects.filter(user=user, word__blocks=learning_block)
-            word_mastery_levels = [word.mastery_level for word in block_user_words]
+            num_learned_words = mastery_summary['learned_count']
+            learning_block.is_completed = num_block_words == num_learned_words
             context.update({
                 'gui_messages': gui_messages,
                 'learning_block': learning_block,
@@ -56,9 +71,10 @@ class BlockDetailView(DetailView):
                 'block_mastery_level': block_mastery_level,
                 'bml_whole_part': bml_whole_part,
                 'bml_fractional_part': round(bml_fractional_part, 3),
-                'ml_chart': get_ml_chart_data(word_mastery_levels),
+                'ml_chart': get_ml_chart_data(mastery_summary['histogram']),
             })
         else:
+            learning_block.is_completed = False
             context.update({
                 'gui_messages': gui_messages,
                 'learning_block': learning_block,
@@ -76,10 +92,7 @@ class EditBlocksView(View):
     model = Block
     
     def get(self, request):
-        blocks = Block.objects.all().order_by('-updated_at')
-        for block in blocks:
-            block.word_count = WordInfo.objects.filter(blocks=block).count()
-        
+        blocks = Block.objects.with_word_count().for_table().order_by('-updated_at')
         context = {
             'gui_messages': get_gui_messages(['base']),
             'blocks': blocks
@@ -145,41 +158,87 @@ class EditWordInfoView(View):
         })
     
     
-class MyWordsListView(LoginRequiredMixin, ListView):
+class UserWordsPageMixin:
+    """
+    User words listed newest first with keyset pagination: a page and a cursor to the next one.
+    format=json returns the page as JSON for infinite scroll.
+    """
+    paginate_by = 50
+
+    def paginate_queryset(self, queryset, page_size):
+        try:
+            user_words, self.next_cursor = paginate_by_added_at(queryset, self.request.GET.get('cursor'), page_size)
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return None, None, user_words, self.next_cursor is not None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') == 'json':
+            return JsonResponse({
+                'user_words': [self.get_user_word_data(user_word) for user_word in context['object_list']],
+                'next_cursor': self.next_cursor,
+            })
+        return super().render_to_response(context, **response_kwargs)
+
+    @staticmethod
+    def get_user_word_data(user_word) -> dict:
+        word = user_word.word
+        return {
+            'id': user_word.id,
+            'name': word.name,
+            'audio': word.audio.url if word.audio else '',
+            'points': user_word.points,
+            'mastery_level': user_word.mastery_level,
+            'transliteration': word.transliteration,
+            'translation': word.translation,
+            'example': word.example or '',
+        }
+
+
+class MyWordsListView(LoginRequiredMixin, UserWordsPageMixin, ListView):
     template_name = 'word_bank/user_words.html'
+    context_object_name = 'words'
     model = UserWord
+
+    def get_queryset(self):
+        return self.model.objects.filter(user=self.request.user).for_table()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        words = self.model.objects.filter(user=user).order_by('-added_at')
-        context['words'] = words
         context['gui_messages'] = get_gui_messages(['base', 'column_titles', 'my_words_title'])
         return context
 
 
-class UserBlockWordsListView(ListView):
+class UserBlockWordsListView(UserWordsPageMixin, ListView):
     template_name = 'word_bank/user_block_words.html'
     context_object_name = 'user_words'
     model = UserWord
     
     def get_queryset(self):
+        try:
+            self.learning_block = get_block(self.kwargs['slug'])
+        except Block.DoesNotExist:
+            raise Http404('No block found matching the query')
+
         user = self.request.user
-        slug = self.kwargs['slug']
-        learning_block = Block.objects.get(slug=slug)
         if user.is_authenticated:
-            return self.model.objects.filter(user=user, word__blocks=learning_block).order_by('-added_at')
+            return self.model.objects.filter(user=user, word__blocks=self.learning_block).for_table()
 
-        return []
+        return self.model.objects.none()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        slug = self.kwargs['slug']
-        context['learning_block'] = Block.objects.get(slug=slug)
+        context['learning_block'] = self.learning_block
         context['gui_messages'] = get_gui_messages(['base', 'column_titles'])
         return context
     
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class AboutView(TemplateView):
     template_name = 'word_bank/about.html'
 